@@ -1,3 +1,4 @@
+from tplexity.llm_client.cache import LLMResponseCache
 from tplexity.llm_client.client import LLMClient, get_llm
 
-__all__ = ["LLMClient", "get_llm"]
+__all__ = ["LLMClient", "LLMResponseCache", "get_llm"]
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """Дисковый кэш ответов LLM для детерминированных запросов (temperature=0)"""
+
+    def __init__(self, cache_dir: str | Path = ".cache/llm"):
+        """
+        Инициализация кэша
+
+        Args:
+            cache_dir (str | Path): Папка для файлов кэша (по одному JSON файлу на запрос)
+        """
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def key(
+        model: str,
+        messages: list[dict[str, str]],
+        temperature: float,
+        max_tokens: int | None = None,
+    ) -> str | None:
+        """
+        Вычислить ключ кэша для запроса
+
+        Args:
+            model (str): Название модели
+            messages (list[dict[str, str]]): Список сообщений в формате OpenAI
+            temperature (float): Температура генерации
+            max_tokens (int | None): Максимальное количество токенов
+
+        Returns:
+            str | None: SHA-256 ключ или None, если ответ недетерминирован (temperature > 0)
+        """
+        if temperature > 0:
+            return None
+
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def get(self, key: str | None) -> str | None:
+        """
+        Получить ответ из кэша
+
+        Args:
+            key (str | None): Ключ кэша
+
+        Returns:
+            str | None: Сохраненный ответ или None, если его нет
+        """
+        if key is None:
+            return None
+
+        path = self.cache_dir / f"{key}.json"
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)["response"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ [llm_client][cache] Поврежденная запись кэша {path}: {e}")
+            return None
+
+    def set(self, key: str | None, response: str):
+        """
+        Сохранить ответ в кэш
+
+        Args:
+            key (str | None): Ключ кэша (если None, ничего не сохраняется)
+            response (str): Ответ LLM
+        """
+        if key is None:
+            return
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.cache_dir / f"{key}.json"
+        # Пишем во временный файл и переименовываем, чтобы не оставить частично записанную запись
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"response": response}, f, ensure_ascii=False)
+        tmp_path.replace(path)
@@ -1,4 +1,6 @@
+import asyncio
 import logging
+from collections.abc import Iterable
 
 from openai import AsyncOpenAI
 
@@ -70,7 +72,8 @@ class LLMClient:
         Raises:
             Exception: При ошибке вызова LLM API
         """
-        temperature = temperature or settings.temperature
+        # Явно переданная temperature=0.0 не должна заменяться значением из настроек
+        temperature = settings.temperature if temperature is None else temperature
         max_tokens = max_tokens or settings.max_tokens
 
         try:
@@ -88,6 +91,62 @@ class LLMClient:
             logger.error(f"❌ [llm_client] Ошибка при вызове LLM: {e}")
             raise
 
+    async def batch_generate(
+        self,
+        messages_list: Iterable[list[dict[str, str]]],
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+        max_concurrency: int | None = None,
+        return_exceptions: bool = False,
+    ) -> list[str | BaseException]:
+        """
+        Генерация ответов на несколько запросов одним пакетом
+
+        Chat Completions API принимает один диалог на запрос, поэтому запросы отправляются
+        одновременно: сервер с continuous batching (vLLM, TGI) обрабатывает их вместе.
+
+        Args:
+            messages_list (Iterable[list[dict[str, str]]]): Диалоги в формате OpenAI (при max_concurrency
+                читаются лениво, по мере освобождения воркеров)
+            temperature (float | None): Температура генерации (если None, используется из settings.llm.temperature)
+            max_tokens (int | None): Максимальное количество токенов (если None, используется из settings.llm.max_tokens)
+            max_concurrency (int | None): Максимальное количество одновременных запросов (None - без ограничения)
+            return_exceptions (bool): Возвращать исключения в списке вместо выброса первого из них
+
+        Returns:
+            list[str | BaseException]: Ответы в порядке messages_list (исключения - только при return_exceptions)
+
+        Raises:
+            Exception: При ошибке вызова LLM API (если return_exceptions=False; остальные запросы отменяются)
+        """
+        if not max_concurrency:
+            # Без ограничения - по воркеру на каждый запрос
+            messages_list = list(messages_list)
+            max_concurrency = len(messages_list)
+
+        # Пул из max_concurrency воркеров, разбирающих общий итератор: одновременно существует
+        # не больше max_concurrency корутин, а messages_list может быть ленивым генератором
+        results: dict[int, str | BaseException] = {}
+        pending = enumerate(messages_list)
+
+        async def worker():
+            for i, messages in pending:
+                try:
+                    results[i] = await self.generate(messages, temperature=temperature, max_tokens=max_tokens)
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results[i] = e
+
+        # TaskGroup при первой ошибке отменяет остальные воркеры, чтобы они не продолжали вызывать LLM
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                for _ in range(max_concurrency):
+                    task_group.create_task(worker())
+        except ExceptionGroup as eg:
+            raise eg.exceptions[0]
+        return [results[i] for i in range(len(results))]
+
 
 def get_llm(provider: str) -> LLMClient:
     """
@@ -2,6 +2,7 @@ import asyncio
 import logging
 import re
 from datetime import datetime
+from functools import lru_cache
 
 from telegram import BotCommand, InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup, Update
 from telegram.ext import Application, CallbackQueryHandler, CommandHandler, ContextTypes, MessageHandler, filters
@@ -256,6 +257,36 @@ def make_citations_clickable(text: str, citation_map: dict[int, str]) -> str:
     return re.sub(pattern, replace_citation, text)
 
 
+@lru_cache(maxsize=4096)
+def format_post_date(date_value: str) -> str:
+    """
+    Форматирует дату поста из ISO строки в читаемый вид ДД.ММ.ГГГГ.
+
+    Результат кэшируется: одни и те же посты часто встречаются в источниках разных ответов.
+
+    Args:
+        date_value: Дата в ISO формате (допускается суффикс Z и дата без времени)
+
+    Returns:
+        str: Дата в формате ДД.ММ.ГГГГ
+
+    Raises:
+        ValueError: Если строку не удалось распарсить
+    """
+    # Обрабатываем Z как UTC
+    if date_value.endswith("Z"):
+        date_value = date_value.replace("Z", "+00:00")
+
+    # Парсим ISO формат
+    if "T" in date_value:
+        post_date = datetime.fromisoformat(date_value)
+    else:
+        # Только дата, добавляем время 00:00:00
+        post_date = datetime.fromisoformat(f"{date_value}T00:00:00")
+
+    return post_date.strftime("%d.%m.%Y")
+
+
 def format_sources(sources: list[dict], cited_numbers: set[int] | None = None) -> str:
     """
     Форматирует источники для красивого отображения в Telegram.
@@ -310,19 +341,7 @@ def format_sources(sources: list[dict], cited_numbers: set[int] | None = None) -
             try:
                 # Обрабатываем ISO формат даты
                 if isinstance(date_value, str):
-                    # Обрабатываем Z как UTC
-                    if date_value.endswith("Z"):
-                        date_value = date_value.replace("Z", "+00:00")
-                    
-                    # Парсим ISO формат
-                    if "T" in date_value:
-                        post_date = datetime.fromisoformat(date_value)
-                    else:
-                        # Только дата, добавляем время 00:00:00
-                        post_date = datetime.fromisoformat(f"{date_value}T00:00:00")
-                    
-                    # Форматируем дату в читаемый формат: ДД.ММ.ГГГГ
-                    date_str = post_date.strftime("%d.%m.%Y")
+                    date_str = format_post_date(date_value)
                 elif isinstance(date_value, datetime):
                     date_str = date_value.strftime("%d.%m.%Y")
             except (ValueError, AttributeError) as e:
@@ -6,6 +6,9 @@ from tplexity.tg_bot.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Количество повторных попыток подключения к Generation API при обрыве соединения
+CONNECT_RETRIES = 2
+
 
 class GenerationClient:
     """Клиент для отправки запросов к Generation API."""
@@ -27,7 +30,12 @@ class GenerationClient:
         """Инициализирует HTTP клиент, если он еще не создан."""
         if self._httpx_client is None:
             timeout_config = httpx.Timeout(self.timeout)
-            self._httpx_client = httpx.AsyncClient(timeout=timeout_config, headers={"Content-Type": "application/json"})
+            # Транспорт повторяет только неудачные попытки установить соединение (запрос еще не отправлен),
+            # поэтому повтор безопасен и для POST, а HTTP ошибки сервиса не повторяются
+            transport = httpx.AsyncHTTPTransport(retries=CONNECT_RETRIES)
+            self._httpx_client = httpx.AsyncClient(
+                timeout=timeout_config, headers={"Content-Type": "application/json"}, transport=transport
+            )
             logger.info("[tg_bot][service_client] Generation client инициализирован")
 
     async def send_message(  # noqa: C901
@@ -113,7 +113,7 @@ class LLMBatcher:
         cache_key = f"{provider}:{hashlib.md5(post_text.encode()).hexdigest()}"
         if cache_key in self.cache:
             relevance_days, raw_response = self.cache[cache_key]
-            logger.debug(f"💾 [llm_batcher] Результат из кэша для поста (длина: {len(post_text)} символов)")
+            logger.debug("💾 [llm_batcher] Результат из кэша для поста (длина: %d символов)", len(post_text))
             return relevance_days, raw_response
 
         # Создаем запрос
@@ -183,7 +183,7 @@ class LLMBatcher:
             except asyncio.TimeoutError:
                 break
 
-        logger.debug(f"📦 [llm_batcher] Собран батч из {len(batch)} запросов")
+        logger.debug("📦 [llm_batcher] Собран батч из %d запросов", len(batch))
         return batch
 
     async def _process_batch(self, batch: list[LLMRequest]):
@@ -252,7 +252,11 @@ class LLMBatcher:
             provider: Провайдер LLM
         """
         try:
-            from tplexity.tg_parse.relevance_analyzer import RELEVANCE_PROMPT
+            from tplexity.tg_parse.relevance_analyzer import (
+                RELEVANCE_MAX_TOKENS,
+                RELEVANCE_PROMPT,
+                extract_relevance_days,
+            )
 
             messages = [
                 {
@@ -264,36 +268,28 @@ class LLMBatcher:
             raw_response = await llm_client.generate(
                 messages=messages,
                 temperature=0.0,
-                max_tokens=50,
+                max_tokens=RELEVANCE_MAX_TOKENS,
             )
 
             # Извлекаем число из ответа
             response = raw_response.strip()
-            digits = ""
-            for char in response:
-                if char.isdigit():
-                    digits += char
-                elif digits:
-                    break
-
-            if not digits:
+            relevance_days = extract_relevance_days(response)
+
+            if relevance_days is None:
                 logger.warning(
-                    f"⚠️ [llm_batcher] Не удалось извлечь число из ответа LLM: {response}, "
-                    f"используем значение по умолчанию 30"
+                    "⚠️ [llm_batcher] Не удалось извлечь число из ответа LLM: %s, используем значение по умолчанию 30",
+                    response,
                 )
                 relevance_days = 30
-            else:
-                relevance_days = int(digits)
-                # Ограничиваем диапазон от 1 до 10000
-                relevance_days = max(1, min(10000, relevance_days))
 
             # Устанавливаем результат
             if not request.future.done():
                 request.future.set_result((relevance_days, raw_response))
 
             logger.debug(
-                f"✅ [llm_batcher] Определена актуальность: {relevance_days} дней "
-                f"для поста (длина: {len(request.post_text)} символов)"
+                "✅ [llm_batcher] Определена актуальность: %d дней для поста (длина: %d символов)",
+                relevance_days,
+                len(request.post_text),
             )
 
         except Exception as e:
@@ -64,65 +64,69 @@ async def send_posts_to_retriever(
     success_count = 0
     error_count = 0
 
-    # Отправляем посты батчами
-    for i in range(0, len(posts), batch_size):
-        batch = posts[i : i + batch_size]
-        documents = []
-
-        for post in batch:
-            text = (post.get("text") or "").strip()
-            if not text:
-                continue
+    # Один HTTP клиент с connection pooling на все батчи канала
+    async with httpx.AsyncClient(
+        limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+        timeout=httpx.Timeout(60.0, connect=10.0),
+    ) as http_client:
+        # Отправляем посты батчами
+        for i in range(0, len(posts), batch_size):
+            batch = posts[i : i + batch_size]
+            documents = []
+
+            for post in batch:
+                text = (post.get("text") or "").strip()
+                if not text:
+                    continue
+
+                # Добавляем время поста в конец текста
+                date_str = post.get("date")
+                if date_str:
+                    try:
+                        # Парсим дату из ISO формата
+                        # Обрабатываем Z как UTC
+                        if date_str.endswith("Z"):
+                            date_str = date_str.replace("Z", "+00:00")
+
+                        # Парсим ISO формат
+                        if "T" in date_str:
+                            post_date = datetime.fromisoformat(date_str)
+                        else:
+                            # Только дата, добавляем время 00:00:00
+                            post_date = datetime.fromisoformat(f"{date_str}T00:00:00")
+
+                        # Форматируем в нужный формат (без timezone)
+                        formatted_date = post_date.strftime("%Y-%m-%d %H:%M:%S")
+                        text = f"{text}\n\n{formatted_date}"
+                    except (ValueError, AttributeError) as e:
+                        logger.debug(f"⚠️ [tg_parse][load_historical_posts] Не удалось распарсить дату: {date_str}, ошибка: {e}")
+
+                # Формируем метаданные (все поля кроме text)
+                metadata = {k: v for k, v in post.items() if k != "text"}
+                metadata["channel_name"] = channel
+                # Добавляем название канала
+                if channel_titles:
+                    channel_title = channel_titles.get(channel, channel)
+                    metadata["channel_title"] = channel_title
+                else:
+                    metadata["channel_title"] = channel
 
-            # Добавляем время поста в конец текста
-            date_str = post.get("date")
-            if date_str:
-                try:
-                    # Парсим дату из ISO формата
-                    # Обрабатываем Z как UTC
-                    if date_str.endswith("Z"):
-                        date_str = date_str.replace("Z", "+00:00")
-
-                    # Парсим ISO формат
-                    if "T" in date_str:
-                        post_date = datetime.fromisoformat(date_str)
-                    else:
-                        # Только дата, добавляем время 00:00:00
-                        post_date = datetime.fromisoformat(f"{date_str}T00:00:00")
-
-                    # Форматируем в нужный формат (без timezone)
-                    formatted_date = post_date.strftime("%Y-%m-%d %H:%M:%S")
-                    text = f"{text}\n\n{formatted_date}"
-                except (ValueError, AttributeError) as e:
-                    logger.debug(f"⚠️ [tg_parse][load_historical_posts] Не удалось распарсить дату: {date_str}, ошибка: {e}")
-
-            # Формируем метаданные (все поля кроме text)
-            metadata = {k: v for k, v in post.items() if k != "text"}
-            metadata["channel_name"] = channel
-            # Добавляем название канала
-            if channel_titles:
-                channel_title = channel_titles.get(channel, channel)
-                metadata["channel_title"] = channel_title
-            else:
-                metadata["channel_title"] = channel
-
-            documents.append({"text": text, "metadata": metadata})
-
-        if not documents:
-            continue
+                documents.append({"text": text, "metadata": metadata})
 
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(documents_url, json={"documents": documents}, timeout=60.0)
+            if not documents:
+                continue
+
+            try:
+                response = await http_client.post(documents_url, json={"documents": documents})
                 response.raise_for_status()
                 success_count += len(documents)
                 logger.info(
                     f"📤 [tg_parse][load_historical_posts] Отправлено {len(documents)} постов из {channel} "
                     f"(батч {i // batch_size + 1}/{(len(posts) + batch_size - 1) // batch_size})"
                 )
-        except Exception as e:
-            error_count += len(documents)
-            logger.error(f"❌ [tg_parse][load_historical_posts] Ошибка при отправке батча из {channel}: {e}")
+            except Exception as e:
+                error_count += len(documents)
+                logger.error(f"❌ [tg_parse][load_historical_posts] Ошибка при отправке батча из {channel}: {e}")
 
     return success_count, error_count
 
@@ -208,6 +212,8 @@ async def load_historical_posts():
         session_name=str(session_path),
         session_string=settings.session_string,
         download_path=str(project_root / settings.data_dir / "telegram"),
+        # Разовая массовая выгрузка: без записи в SQLite файл сессии во время скачивания
+        in_memory_session=True,
     )
 
     try:
@@ -290,7 +296,7 @@ async def load_historical_posts():
                 messages_with_text = [
                     msg
                     for msg in all_messages
-                    if msg.get("text") and isinstance(msg.get("text"), str) and msg.get("text").strip()
+                    if (text := msg.get("text")) and isinstance(text, str) and text.strip()
                 ]
 
                 total_posts_downloaded += len(messages_with_text)
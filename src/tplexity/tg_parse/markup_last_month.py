@@ -233,6 +233,8 @@ async def markup_last_month(days: int = 14):
         session_name=str(session_path),
         session_string=settings.session_string,
         download_path=str(project_root / settings.data_dir / "telegram"),
+        # Разовая массовая выгрузка: без записи в SQLite файл сессии во время скачивания
+        in_memory_session=True,
     )
 
     # Инициализируем LLM батчер
@@ -321,9 +323,7 @@ async def markup_last_month(days: int = 14):
                 messages_with_text = [
                     msg
                     for msg in all_messages
-                    if msg.get("text")
-                    and isinstance(msg.get("text"), str)
-                    and msg.get("text").strip()
+                    if (text := msg.get("text")) and isinstance(text, str) and text.strip()
                 ]
 
                 total_posts_downloaded += len(messages_with_text)
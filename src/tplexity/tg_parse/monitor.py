@@ -1,4 +1,5 @@
 import asyncio
+import logging
 import os
 from datetime import datetime
 
@@ -44,7 +45,8 @@ class ChannelMonitor:
 
                 if messages:
                     filename = "messages_monitor.json"
-                    filepath = self.downloader.save_to_json(messages, channel, filename=filename)
+                    # Файл читается только программно: компактная запись идет через C-энкодер json
+                    filepath = self.downloader.save_to_json(messages, channel, filename=filename, pretty=False)
 
                     last_id = max(msg["id"] for msg in messages)
                     self.channel_states[channel] = (last_id, filepath)
@@ -135,6 +137,8 @@ class ChannelMonitor:
 async def main():
     """Главная функция."""
     load_dotenv()
+    # Прогресс TelegramDownloader пишется через logging
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
 
     print("Асинхронный мониторинг Telegram каналов")
 
@@ -5,7 +5,7 @@
 import asyncio
 import json
 import logging
-from collections import deque
+from collections import defaultdict, deque
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -19,18 +19,67 @@ from telethon.tl.types import Message
 from tplexity.tg_parse.llm_batcher import get_batcher
 from tplexity.tg_parse.post_deletion_service import PostDeletionService
 from tplexity.tg_parse.relevance_analyzer import calculate_delete_date
-from tplexity.tg_parse.telegram_downloader import TelegramDownloader
+from tplexity.tg_parse.telegram_downloader import TelegramDownloader, append_to_json_array, iter_json_array
 
 logger = logging.getLogger(__name__)
 
+# Поля поста, передаваемые в Retriever как метаданные документа (text уходит отдельно)
+_METADATA_KEYS = ("id", "link", "date", "edit_date", "views", "forwards", "has_media", "media_type")
 
-@dataclass
+
+def _parse_post_date(date_str: str | None) -> datetime | None:
+    """
+    Парсит дату публикации поста из ISO формата.
+
+    Args:
+        date_str: Дата в ISO формате (допускается суффикс Z и дата без времени)
+
+    Returns:
+        Дата публикации или None, если дату не удалось распарсить
+    """
+    if not date_str:
+        return None
+
+    try:
+        # Обрабатываем Z как UTC
+        if date_str.endswith("Z"):
+            date_str = date_str.replace("Z", "+00:00")
+
+        if "T" in date_str:
+            return datetime.fromisoformat(date_str)
+        # Только дата, добавляем время 00:00:00
+        return datetime.fromisoformat(f"{date_str}T00:00:00")
+    except (ValueError, AttributeError) as e:
+        logger.debug("⚠️ [tg_parse][monitor_service] Не удалось распарсить дату: %s, ошибка: %s", date_str, e)
+        return None
+
+
+def _read_message_ids(messages_file: Path) -> set[int]:
+    """
+    Собирает ID сообщений из JSON-массива в файле канала, разбирая его потоково.
+
+    Args:
+        messages_file: Путь к файлу messages_monitor.json
+
+    Returns:
+        Множество ID сообщений (пустое для пустого файла)
+    """
+    return {msg.get("id") for msg in iter_json_array(messages_file)}
+
+
+@dataclass(slots=True)
 class FailedPost:
     """Структура для хранения неудачно отправленного поста"""
 
     post_data: dict[str, Any]
     channel: str
+    channel_title: str | None = None
     retry_count: int = 0
+    # Время следующей попытки по часам event loop (0 - отправить при ближайшем пробуждении)
+    next_retry_at: float = 0.0
+    # Сериализованное тело запроса к Retriever (формируется один раз, включая вызов LLM;
+    # не сохраняется, если актуальность определить не удалось - тогда LLM вызывается при повторе)
+    serialized: bytes | None = None
 
 
 class TelegramMonitorService:
@@ -52,6 +101,9 @@ class TelegramMonitorService:
         qdrant_api_key: str | None = None,
         qdrant_collection_name: str | None = None,
         qdrant_timeout: int = 60,
+        flush_interval: float = 2.0,
+        flush_batch_size: int = 64,
+        max_concurrent_sends: int = 16,
     ):
         self.api_id = api_id
         self.api_hash = api_hash
@@ -64,6 +116,8 @@ class TelegramMonitorService:
         self.qdrant_api_key = qdrant_api_key
         self.qdrant_collection_name = qdrant_collection_name
         self.qdrant_timeout = qdrant_timeout
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
 
         # Определяем корень проекта (4 уровня выше от monitor_service.py)
         self.project_root = Path(__file__).parent.parent.parent.parent
@@ -79,8 +133,19 @@ class TelegramMonitorService:
         # Очередь для повторных попыток отправки неудачных постов
         self.failed_posts: deque[FailedPost] = deque()
         self.retry_task: asyncio.Task | None = None
+        # Сигнал для задачи повторных попыток о появлении новых постов в очереди
+        self._retry_event = asyncio.Event()
         self.deletion_task: asyncio.Task | None = None
         
+        # Индекс ID уже сохраненных сообщений (username -> множество ID), строится при первой записи
+        self._seen_ids: dict[str, set[int]] = {}
+
+        # Буфер отложенной записи сообщений на диск (username -> новые сообщения)
+        self._pending_writes: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        self._write_lock = asyncio.Lock()
+        self._flush_event = asyncio.Event()
+        self.flush_task: asyncio.Task | None = None
+
         # Словарь для отслеживания каналов (username -> entity)
         self.channel_entities: dict[str, Any] = {}
         # Словарь для хранения названий каналов (username -> title)
@@ -91,6 +156,8 @@ class TelegramMonitorService:
 
         # HTTP клиент с connection pooling (инициализируется при необходимости)
         self.http_client: httpx.AsyncClient | None = None
+        # Ограничение числа одновременных отправок в Retriever
+        self._send_semaphore = asyncio.Semaphore(max_concurrent_sends)
 
         # LLM батчер для оптимизации запросов
         self.llm_batcher = get_batcher(llm_provider)
@@ -135,15 +202,15 @@ class TelegramMonitorService:
                 )
         logger.info("=" * 60)
 
-        # Детальное логирование перед созданием TelegramDownloader
-        logger.info("🔍 [tg_parse][monitor_service] ПЕРЕД созданием TelegramDownloader:")
-        logger.info(f"   self.session_string type: {type(self.session_string)}")
-        logger.info(f"   self.session_string value: {self.session_string}")
-        logger.info(f"   self.session_string is None: {self.session_string is None}")
-        logger.info(f"   self.session_string == '': {self.session_string == ''}")
-        if self.session_string:
-            logger.info(f"   self.session_string.strip() == '': {self.session_string.strip() == ''}")
-            logger.info(f"   self.session_string длина: {len(self.session_string)}")
+        # Детальное логирование перед созданием TelegramDownloader (только в DEBUG)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔍 [tg_parse][monitor_service] ПЕРЕД созданием TelegramDownloader:")
+            logger.debug("   self.session_string type: %s", type(self.session_string))
+            logger.debug("   self.session_string is None: %s", self.session_string is None)
+            logger.debug("   self.session_string == '': %s", self.session_string == "")
+            if self.session_string:
+                logger.debug("   self.session_string.strip() == '': %s", self.session_string.strip() == "")
+                logger.debug("   self.session_string длина: %d", len(self.session_string))
 
         # Создаем TelegramDownloader
         logger.info("🔧 [tg_parse][monitor_service] Создание TelegramDownloader...")
@@ -223,6 +290,18 @@ class TelegramMonitorService:
         self.is_running = True
         logger.info("🚀 [tg_parse][monitor_service] Запуск мониторинга каналов через WebSocket...")
 
+        # Используем замыкание для правильного захвата channel и его названия:
+        # они неизменны на всё время жизни обработчика, поэтому вычисляются один раз
+        def make_handler(channel_name: str):
+            channel_title = self.channel_titles.get(channel_name, channel_name)
+            handle_new_message = self._handle_new_message
+
+            async def handler(event: events.NewMessage.Event):
+                """Обработчик новых сообщений из канала"""
+                await handle_new_message(event, channel_name, channel_title)
+
+            return handler
+
         # Регистрируем обработчики событий для каждого канала
         for channel in self.channels:
             if channel not in self.channel_entities:
@@ -231,14 +310,6 @@ class TelegramMonitorService:
 
             entity = self.channel_entities[channel]
 
-            # Используем замыкание для правильного захвата channel
-            def make_handler(channel_name: str):
-                async def handler(event: events.NewMessage.Event):
-                    """Обработчик новых сообщений из канала"""
-                    await self._handle_new_message(event, channel_name)
-
-                return handler
-
             self.downloader.client.add_event_handler(make_handler(channel), events.NewMessage(chats=entity))
 
             logger.info(f"✅ [tg_parse][monitor_service] Зарегистрирован обработчик для канала: {channel}")
@@ -246,6 +317,9 @@ class TelegramMonitorService:
         # Запускаем фоновую задачу для повторных попыток
         self.retry_task = asyncio.create_task(self._retry_failed_posts_loop())
 
+        # Запускаем фоновую задачу для сброса буфера сообщений на диск
+        self.flush_task = asyncio.create_task(self._flush_loop())
+
         # Инициализируем и запускаем сервис удаления постов, если настроены параметры Qdrant
         if (
             self.qdrant_host
@@ -279,7 +353,7 @@ class TelegramMonitorService:
         # когда клиент подключен и обработчики зарегистрированы
         logger.info("✅ [tg_parse][monitor_service] Мониторинг запущен, ожидание новых сообщений...")
 
-    async def _handle_new_message(self, event: events.NewMessage.Event, channel: str):
+    async def _handle_new_message(self, event: events.NewMessage.Event, channel: str, channel_title: str):
         """Обрабатывает новое сообщение из канала."""
         try:
             message = event.message
@@ -294,194 +368,402 @@ class TelegramMonitorService:
             message_dict = await self.downloader._message_to_dict(message, channel)
 
             logger.info(
-                f"📨 [tg_parse][monitor_service] Новое сообщение из канала {channel}: ID={message.id}, "
-                f"длина текста={len(message.text)}"
+                "📨 [tg_parse][monitor_service] Новое сообщение из канала %s: ID=%s, длина текста=%d",
+                channel,
+                message.id,
+                len(message.text),
             )
 
             # Сохраняем сообщение локально
             await self._save_message(channel, message_dict)
 
+            # Парсим дату один раз при получении, а не при каждой (повторной) отправке.
+            # Служебные поля с префиксом "_" не входят в _METADATA_KEYS и не попадают в метаданные
+            post_date = _parse_post_date(message_dict.get("date"))
+            message_dict["_post_date"] = post_date
+            message_dict["_formatted_date"] = post_date.strftime("%Y-%m-%d %H:%M:%S") if post_date else None
+
             # Отправляем в retriever (без чанкирования, полностью)
             if self.webhook_url:
-                success = await self._send_post_to_retriever(message_dict, channel)
-                if not success:
-                    # Добавляем в очередь для повторных попыток
-                    failed_post = FailedPost(post_data=message_dict, channel=channel)
+                built = await self._build_request_body(message_dict, channel, channel_title)
+                body, has_delete_date = built if built is not None else (None, False)
+                if body is not None and not await self._post_to_retriever(body, message.id, channel):
+                    # Добавляем в очередь для повторных попыток вместе с готовым телом запроса
+                    # (тело без delete_date не сохраняем, чтобы повтор заново определил актуальность)
+                    failed_post = FailedPost(
+                        post_data=message_dict,
+                        channel=channel,
+                        channel_title=channel_title,
+                        serialized=body if has_delete_date else None,
+                    )
                     self.failed_posts.append(failed_post)
+                    self._retry_event.set()
                     logger.warning(
-                        f"⚠️ [tg_parse][monitor_service] Не удалось отправить пост {message.id} из {channel}, "
-                        f"добавлен в очередь повторных попыток"
+                        "⚠️ [tg_parse][monitor_service] Не удалось отправить пост %s из %s, "
+                        "добавлен в очередь повторных попыток",
+                        message.id,
+                        channel,
                     )
 
         except Exception as e:
-            logger.error(f"❌ [tg_parse][monitor_service] Ошибка при обработке нового сообщения из {channel}: {e}", exc_info=True)
+            logger.error(
+                "❌ [tg_parse][monitor_service] Ошибка при обработке нового сообщения из %s: %s", channel, e, exc_info=True
+            )
 
     async def _save_message(self, channel: str, message_dict: dict[str, Any]):
-        """Сохраняет новое сообщение в файл (асинхронный I/O)."""
+        """
+        Добавляет новое сообщение в буфер записи.
+
+        Буфер сбрасывается на диск фоновой задачей раз в flush_interval секунд
+        или сразу, как только в канале накопится flush_batch_size сообщений.
+        """
+        seen_ids = self._seen_ids.get(channel)
+        if seen_ids is not None and message_dict.get("id") in seen_ids:
+            return
+
+        # Копия, чтобы служебные поля, добавленные позже, не попали в файл
+        pending = self._pending_writes[channel]
+        pending.append(dict(message_dict))
+        if len(pending) >= self.flush_batch_size:
+            self._flush_event.set()
+
+    async def _flush_loop(self):
+        """Фоновая задача для периодического сброса буфера сообщений на диск."""
+        while self.is_running:
+            try:
+                try:
+                    await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+                except TimeoutError:
+                    pass
+                self._flush_event.clear()
+
+                await self._flush_pending_writes()
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌ [tg_parse][monitor_service] Ошибка при сбросе буфера сообщений: {e}", exc_info=True)
+
+    async def _flush_pending_writes(self):
+        """Записывает накопленные в буфере сообщения на диск (одна запись на канал)."""
+        async with self._write_lock:
+            if not self._pending_writes:
+                return
+
+            pending_writes = self._pending_writes
+            self._pending_writes = defaultdict(list)
+            unwritten = dict(pending_writes)
+
+            try:
+                # Ошибка записи одного канала не должна терять буферы остальных каналов
+                for channel, messages in pending_writes.items():
+                    try:
+                        await self._write_messages(channel, messages)
+                    except Exception as e:
+                        logger.error(
+                            f"❌ [tg_parse][monitor_service] Ошибка при записи {len(messages)} сообщений "
+                            f"канала {channel}, повтор при следующем сбросе: {e}",
+                            exc_info=True,
+                        )
+                        continue
+                    del unwritten[channel]
+            finally:
+                # Незаписанные каналы (ошибка записи или отмена задачи) возвращаются в начало буфера
+                for channel, messages in unwritten.items():
+                    self._pending_writes[channel][:0] = messages
+
+    async def _index_channel(self, messages_file: Path) -> set[int]:
+        """
+        Строит индекс ID сообщений по файлу канала (один раз на канал).
+
+        Файл разбирается потоково: в памяти не держится ни его содержимое, ни список сообщений.
+        """
+        if not messages_file.exists():
+            return set()
+
+        return await asyncio.to_thread(_read_message_ids, messages_file)
+
+    async def _write_messages(self, channel: str, messages: list[dict[str, Any]]):
+        """
+        Дописывает новые сообщения канала в конец JSON-массива в файле (асинхронный I/O).
+
+        Файл не перечитывается: дубликаты отсекаются по индексу ID, а новые элементы
+        вставляются перед закрывающей скобкой массива.
+        """
         channel_dir = self.telegram_dir / channel
         channel_dir.mkdir(parents=True, exist_ok=True)
 
         messages_file = channel_dir / "messages_monitor.json"
 
-        # Загружаем существующие сообщения (асинхронно)
-        existing_messages = []
-        if messages_file.exists():
-            async with aiofiles.open(messages_file, mode="r", encoding="utf-8") as f:
-                content = await f.read()
-                existing_messages = json.loads(content)
+        # При первой записи в канал строим индекс ID по содержимому файла
+        seen_ids = self._seen_ids.get(channel)
+        if seen_ids is None:
+            seen_ids = await self._index_channel(messages_file)
+            self._seen_ids[channel] = seen_ids
+
+        # Оставляем только новые сообщения
+        new_messages = []
+        new_ids = set()
+        for message_dict in messages:
+            message_id = message_dict.get("id")
+            if message_id in seen_ids or message_id in new_ids:
+                continue
+            new_messages.append(message_dict)
+            new_ids.add(message_id)
 
-        # Добавляем новое сообщение (если его еще нет)
-        message_id = message_dict.get("id")
-        if not any(msg.get("id") == message_id for msg in existing_messages):
-            existing_messages.append(message_dict)
+        if not new_messages:
+            return
 
-            # Сохраняем (асинхронно)
-            async with aiofiles.open(messages_file, mode="w", encoding="utf-8") as f:
-                await f.write(json.dumps(existing_messages, ensure_ascii=False, indent=2))
+        write = asyncio.ensure_future(asyncio.to_thread(append_to_json_array, messages_file, new_messages))
+        try:
+            await asyncio.shield(write)
+        except asyncio.CancelledError:
+            # Отмена не прерывает поток записи: дожидаемся его, чтобы не писать в файл параллельно
+            # и не записать эти сообщения второй раз после их возврата в буфер
+            await asyncio.wait([write])
+            if write.exception() is None:
+                seen_ids.update(new_ids)
+            raise
+        # ID попадают в индекс только после успешной записи, иначе повторная запись отсекла бы их как дубликаты
+        seen_ids.update(new_ids)
 
-            logger.debug(f"💾 [tg_parse][monitor_service] Сообщение сохранено в {messages_file}")
+        logger.debug("💾 [tg_parse][monitor_service] %d сообщений сохранено в %s", len(new_messages), messages_file)
 
-    async def _send_post_to_retriever(self, post_dict: dict[str, Any], channel: str) -> bool:
+    async def _build_request_body(
+        self, post_dict: dict[str, Any], channel: str, channel_title: str | None = None
+    ) -> tuple[bytes, bool] | None:
         """
-        Отправляет пост полностью (без чанкирования) в Retriever API.
+        Формирует сериализованное тело запроса к Retriever API для поста (полностью, без чанкирования).
+
+        Включает определение актуальности поста через LLM, поэтому результат
+        сохраняется в FailedPost и переиспользуется при повторных попытках.
+        Тело без delete_date (ошибка LLM) не сохраняется, чтобы повтор заново определил актуальность.
+
+        Args:
+            post_dict: Словарь с данными поста
+            channel: Username канала
+            channel_title: Название канала (если None, берется из self.channel_titles)
 
         Returns:
-            True если отправка успешна, False в противном случае
+            (тело запроса в JSON (UTF-8), определена ли delete_date) или None, если у поста нет текста
         """
-        try:
-            text = (post_dict.get("text") or "").strip()
-            if not text:
-                logger.warning("⚠️ [tg_parse][monitor_service] Пост без текста пропущен")
-                return True  # Не считаем это ошибкой
-
-            # Добавляем время поста в конец текста
-            date_str = post_dict.get("date")
-            if date_str:
-                try:
-                    # Парсим дату из ISO формата
-                    # Обрабатываем Z как UTC
-                    if date_str.endswith("Z"):
-                        date_str = date_str.replace("Z", "+00:00")
-
-                    # Парсим ISO формат
-                    if "T" in date_str:
-                        post_date = datetime.fromisoformat(date_str)
-                    else:
-                        # Только дата, добавляем время 00:00:00
-                        post_date = datetime.fromisoformat(f"{date_str}T00:00:00")
-
-                    # Форматируем в нужный формат (без timezone)
-                    formatted_date = post_date.strftime("%Y-%m-%d %H:%M:%S")
-                    text = f"{text}\n\n{formatted_date}"
-                except (ValueError, AttributeError) as e:
-                    logger.debug(f"⚠️ [tg_parse][monitor_service] Не удалось распарсить дату: {date_str}, ошибка: {e}")
-
-            # Формируем метаданные (все поля кроме text)
-            metadata = {k: v for k, v in post_dict.items() if k != "text"}
-            metadata["channel_name"] = channel
-            # Добавляем название канала
+        text = (post_dict.get("text") or "").strip()
+        if not text:
+            logger.warning("⚠️ [tg_parse][monitor_service] Пост без текста пропущен")
+            return None
+
+        # Добавляем время поста в конец текста (дата уже распарсена в _handle_new_message)
+        if "_post_date" in post_dict:
+            post_date = post_dict["_post_date"]
+            formatted_date = post_dict["_formatted_date"]
+        else:
+            post_date = _parse_post_date(post_dict.get("date"))
+            formatted_date = post_date.strftime("%Y-%m-%d %H:%M:%S") if post_date else None
+        if formatted_date:
+            text = f"{text}\n\n{formatted_date}"
+
+        # Формируем метаданные (только известные поля поста, без служебных)
+        metadata = {k: post_dict[k] for k in _METADATA_KEYS if k in post_dict}
+        metadata["channel_name"] = channel
+        # Добавляем название канала
+        if channel_title is None:
             channel_title = self.channel_titles.get(channel, channel)
-            metadata["channel_title"] = channel_title
+        metadata["channel_title"] = channel_title
 
-            # Определяем актуальность поста через LLM с батчингом и добавляем дату удаления
-            try:
-                relevance_days, llm_response = await self.llm_batcher.determine_relevance_days(
-                    text, self.llm_provider
-                )
-                
-                # Парсим дату публикации поста для расчета даты удаления
-                post_publication_date = None
-                date_str = post_dict.get("date")
-                if date_str:
-                    try:
-                        if date_str.endswith("Z"):
-                            date_str = date_str.replace("Z", "+00:00")
-                        if "T" in date_str:
-                            post_publication_date = datetime.fromisoformat(date_str)
-                        else:
-                            post_publication_date = datetime.fromisoformat(f"{date_str}T00:00:00")
-                    except (ValueError, AttributeError) as e:
-                        logger.debug(f"⚠️ [monitor_service] Не удалось распарсить дату публикации: {date_str}, ошибка: {e}")
-                
-                # Вычисляем дату удаления от даты публикации
-                delete_date = calculate_delete_date(relevance_days, post_publication_date)
-                metadata["delete_date"] = delete_date
-                logger.info(
-                    f"📅 [monitor_service] Для поста {post_dict.get('id')} из {channel} определена дата удаления: {delete_date} "
-                    f"(актуальность: {relevance_days} дней от даты публикации, ответ LLM: {llm_response})"
-                )
-            except Exception as e:
-                logger.error(
-                    f"❌ [monitor_service] Ошибка при определении актуальности поста {post_dict.get('id')}: {e}",
-                    exc_info=True
-                )
-                # Продолжаем без delete_date, пост не будет удален автоматически
+        # Определяем актуальность поста через LLM с батчингом и добавляем дату удаления
+        has_delete_date = False
+        try:
+            relevance_days, llm_response = await self.llm_batcher.determine_relevance_days(
+                text, self.llm_provider
+            )
+
+            # Вычисляем дату удаления от даты публикации
+            delete_date = calculate_delete_date(relevance_days, post_date)
+            metadata["delete_date"] = delete_date
+            has_delete_date = True
+            logger.info(
+                "📅 [monitor_service] Для поста %s из %s определена дата удаления: %s "
+                "(актуальность: %s дней от даты публикации, ответ LLM: %s)",
+                post_dict.get("id"),
+                channel,
+                delete_date,
+                relevance_days,
+                llm_response,
+            )
+        except Exception as e:
+            logger.error(
+                "❌ [monitor_service] Ошибка при определении актуальности поста %s: %s",
+                post_dict.get("id"),
+                e,
+                exc_info=True,
+            )
+            # Продолжаем без delete_date, пост не будет удален автоматически
 
-            # Формируем документ для Retriever API
-            document = {"text": text, "metadata": metadata}
+        # Формируем документ для Retriever API
+        document = {"text": text, "metadata": metadata}
+        return json.dumps({"documents": [document]}, ensure_ascii=False).encode("utf-8"), has_delete_date
 
-            # Отправляем в Retriever API используя переиспользуемый клиент с connection pooling
-            if not self.http_client:
-                logger.error("❌ [tg_parse][monitor_service] HTTP клиент не инициализирован")
-                return False
+    async def _post_to_retriever(self, body: bytes, post_id: Any, channel: str) -> bool:
+        """
+        Отправляет готовое тело запроса в Retriever API.
 
-            try:
+        Args:
+            body: Тело запроса, сформированное _build_request_body
+            post_id: ID поста (для логирования)
+            channel: Username канала (для логирования)
+
+        Returns:
+            True если отправка успешна, False в противном случае
+        """
+        # Отправляем в Retriever API используя переиспользуемый клиент с connection pooling
+        if not self.http_client:
+            logger.error("❌ [tg_parse][monitor_service] HTTP клиент не инициализирован")
+            return False
+
+        try:
+            async with self._send_semaphore:
                 response = await self.http_client.post(
-                    self.webhook_url, json={"documents": [document]}, timeout=30.0
+                    self.webhook_url,
+                    content=body,
+                    headers={"Content-Type": "application/json"},
+                    timeout=30.0,
                 )
-                response.raise_for_status()
-                logger.info(
-                    f"📤 [tg_parse][monitor_service] Пост {post_dict.get('id')} из {channel} " f"успешно отправлен в Retriever"
-                )
-                return True
-            except httpx.HTTPError as e:
-                logger.error(
-                    f"❌ [tg_parse][monitor_service] HTTP ошибка при отправке поста {post_dict.get('id')}: {e}"
-                )
-                return False
+            response.raise_for_status()
+            logger.info("📤 [tg_parse][monitor_service] Пост %s из %s успешно отправлен в Retriever", post_id, channel)
+            return True
+        except httpx.HTTPError as e:
+            logger.error("❌ [tg_parse][monitor_service] HTTP ошибка при отправке поста %s: %s", post_id, e)
+            return False
         except Exception as e:
             logger.error(
-                f"❌ [tg_parse][monitor_service] Ошибка при отправке поста {post_dict.get('id')} "
-                f"из {channel} в Retriever API: {e}"
+                "❌ [tg_parse][monitor_service] Ошибка при отправке поста %s из %s в Retriever API: %s",
+                post_id,
+                channel,
+                e,
             )
             return False
 
+    async def _send_failed_post(self, failed_post: FailedPost) -> bool:
+        """
+        Повторно отправляет пост из очереди, переиспользуя сохраненное тело запроса.
+
+        Returns:
+            True если отправка успешна (или пост без текста), False в противном случае
+        """
+        post_id = failed_post.post_data.get("id")
+
+        body = failed_post.serialized
+        if body is None:
+            try:
+                built = await self._build_request_body(
+                    failed_post.post_data, failed_post.channel, failed_post.channel_title
+                )
+            except Exception as e:
+                logger.error(
+                    "❌ [tg_parse][monitor_service] Ошибка при подготовке поста %s из %s: %s",
+                    post_id,
+                    failed_post.channel,
+                    e,
+                )
+                return False
+            if built is None:
+                return True  # Пост без текста не считаем ошибкой
+
+            body, has_delete_date = built
+            # Тело без delete_date не сохраняем: при следующем повторе актуальность определяется заново
+            if has_delete_date:
+                failed_post.serialized = body
+
+        return await self._post_to_retriever(body, post_id, failed_post.channel)
+
+    def _retry_delay(self, retry_count: int) -> float:
+        """
+        Экспоненциальная задержка перед следующей попыткой.
+
+        Args:
+            retry_count: Количество уже неудавшихся повторных попыток
+
+        Returns:
+            Задержка в секундах (не больше retry_interval * 8)
+        """
+        return min(self.retry_interval * 2 ** max(retry_count - 1, 0), self.retry_interval * 8)
+
+    def _pop_due_posts(self, now: float) -> list[FailedPost]:
+        """
+        Забирает из очереди посты, для которых подошло время попытки (остальные остаются в очереди).
+
+        Args:
+            now: Текущее время по часам event loop
+
+        Returns:
+            Посты для повторной отправки в порядке очереди
+        """
+        posts_to_retry = []
+        for _ in range(len(self.failed_posts)):
+            failed_post = self.failed_posts.popleft()
+            if failed_post.next_retry_at <= now:
+                posts_to_retry.append(failed_post)
+            else:
+                self.failed_posts.append(failed_post)
+        return posts_to_retry
+
     async def _retry_failed_posts_loop(self):
-        """Фоновая задача для повторных попыток отправки неудачных постов."""
+        """
+        Фоновая задача для повторных попыток отправки неудачных постов.
+
+        Пока очередь пуста, задача спит до сигнала _retry_event; иначе просыпается
+        к ближайшей запланированной попытке (с экспоненциальной задержкой для каждого поста).
+        """
         logger.info("🔄 [tg_parse][monitor_service] Запущена задача для повторных попыток отправки постов")
 
+        loop = asyncio.get_running_loop()
+
         while self.is_running:
             try:
-                await asyncio.sleep(self.retry_interval)
+                timeout = None
+                if self.failed_posts:
+                    next_retry_at = min(failed_post.next_retry_at for failed_post in self.failed_posts)
+                    timeout = max(0.0, next_retry_at - loop.time())
 
-                if not self.failed_posts:
-                    continue
+                try:
+                    await asyncio.wait_for(self._retry_event.wait(), timeout=timeout)
+                except TimeoutError:
+                    pass
+                self._retry_event.clear()
 
-                logger.info(f"🔄 [tg_parse][monitor_service] Попытка повторной отправки {len(self.failed_posts)} постов")
+                posts_to_retry = self._pop_due_posts(loop.time())
+                if not posts_to_retry:
+                    continue
 
-                # Обрабатываем все посты в очереди
-                posts_to_retry = list(self.failed_posts)
-                self.failed_posts.clear()
+                logger.info("🔄 [tg_parse][monitor_service] Попытка повторной отправки %d постов", len(posts_to_retry))
 
-                for failed_post in posts_to_retry:
+                for i, failed_post in enumerate(posts_to_retry):
                     if not self.is_running:
+                        # Возвращаем необработанные посты в очередь
+                        self.failed_posts.extend(posts_to_retry[i:])
                         break
 
-                    success = await self._send_post_to_retriever(failed_post.post_data, failed_post.channel)
+                    success = await self._send_failed_post(failed_post)
 
                     if not success:
-                        # Увеличиваем счетчик попыток и возвращаем в очередь
+                        # Увеличиваем счетчик попыток и возвращаем в очередь с задержкой
                         failed_post.retry_count += 1
+                        delay = self._retry_delay(failed_post.retry_count)
+                        failed_post.next_retry_at = loop.time() + delay
                         self.failed_posts.append(failed_post)
                         logger.warning(
-                            f"⚠️ [tg_parse][monitor_service] Повторная попытка {failed_post.retry_count} "
-                            f"для поста {failed_post.post_data.get('id')} из {failed_post.channel} "
-                            f"не удалась, будет повторена через {self.retry_interval} секунд"
+                            "⚠️ [tg_parse][monitor_service] Повторная попытка %d для поста %s из %s "
+                            "не удалась, будет повторена через %s секунд",
+                            failed_post.retry_count,
+                            failed_post.post_data.get("id"),
+                            failed_post.channel,
+                            delay,
                         )
                     else:
                         logger.info(
-                            f"✅ [tg_parse][monitor_service] Пост {failed_post.post_data.get('id')} "
-                            f"из {failed_post.channel} успешно отправлен после повторной попытки"
+                            "✅ [tg_parse][monitor_service] Пост %s из %s успешно отправлен после повторной попытки",
+                            failed_post.post_data.get("id"),
+                            failed_post.channel,
                         )
 
             except asyncio.CancelledError:
@@ -515,7 +797,7 @@ class TelegramMonitorService:
                 messages_with_text = [
                     msg
                     for msg in messages
-                    if msg.get("text") and isinstance(msg.get("text"), str) and msg.get("text").strip()
+                    if (text := msg.get("text")) and isinstance(text, str) and text.strip()
                 ]
                 saved_count = len(messages_with_text)
 
@@ -529,8 +811,11 @@ class TelegramMonitorService:
                     channel_dir.mkdir(parents=True, exist_ok=True)
 
                     messages_file = channel_dir / "messages_monitor.json"
-                    async with aiofiles.open(messages_file, mode="w", encoding="utf-8") as f:
-                        await f.write(json.dumps(messages_with_text, ensure_ascii=False, indent=2))
+                    async with self._write_lock:
+                        async with aiofiles.open(messages_file, mode="w", encoding="utf-8") as f:
+                            await f.write(json.dumps(messages_with_text, ensure_ascii=False, indent=2))
+                        # Файл перезаписан целиком - обновляем индекс ID
+                        self._seen_ids[channel] = {msg.get("id") for msg in messages_with_text}
 
                     logger.info(f"💾 [tg_parse][monitor_service] Сохранено в {messages_file}")
 
@@ -552,6 +837,21 @@ class TelegramMonitorService:
         )
         return results
 
+    async def _stop_flush_task(self):
+        """
+        Останавливает задачу сброса буфера и записывает оставшиеся в нем сообщения.
+
+        Задача не отменяется (отмена посреди записи оборвала бы сброс): is_running уже False,
+        поэтому цикл завершится после текущего сброса.
+        """
+        if self.flush_task:
+            self._flush_event.set()
+            await self.flush_task
+        try:
+            await self._flush_pending_writes()
+        except Exception as e:
+            logger.error(f"❌ [tg_parse][monitor_service] Ошибка при сбросе буфера сообщений: {e}", exc_info=True)
+
     async def stop_monitoring(self):
         """Останавливает мониторинг."""
         logger.info("🛑 [tg_parse][monitor_service] Остановка мониторинга...")
@@ -570,6 +870,9 @@ class TelegramMonitorService:
             self.downloader.client.remove_event_handlers()
             logger.info("✅ [tg_parse][monitor_service] Обработчики событий удалены")
 
+        # Останавливаем задачу сброса буфера и записываем оставшиеся сообщения
+        await self._stop_flush_task()
+
         # Закрываем Telegram соединение
         if self.downloader and self.downloader.client:
             try:
@@ -2,13 +2,26 @@
 Модуль для определения актуальности поста через LLM
 """
 
+import bisect
 import logging
+import re
 from datetime import datetime, timedelta
 
 from tplexity.llm_client import get_llm
 
 logger = logging.getLogger(__name__)
 
+# Первая непрерывная последовательность цифр в ответе LLM
+_DIGITS_RE = re.compile(r"\d+")
+
+# Ответ - одно число от 1 до 10000: до 5 цифр (токенайзеры часто кодируют цифры по одной)
+# плюс запас на пробел/перевод строки. Каждый лишний токен - отдельный шаг декодирования.
+# Стоп-последовательность "\n" не используется: ответ, начинающийся с перевода строки, обрывался бы пустым
+RELEVANCE_MAX_TOKENS = 8
+
+# Границы корзин по примерной длине поста в токенах (~4 символа на токен)
+LENGTH_BUCKET_BOUNDS = (512, 2048)
+
 # Примерные значения актуальности для разных топиков (в днях)
 RELEVANCE_EXAMPLES = {
     "новости": 7,
@@ -79,6 +92,42 @@ RELEVANCE_PROMPT = """Ты - эксперт по анализу финансов
 Количество дней актуальности:"""
 
 
+def bucket_by_length(texts: list[str], bounds: tuple[int, ...] = LENGTH_BUCKET_BOUNDS) -> list[list[int]]:
+    """
+    Группирует тексты по примерной длине в токенах, чтобы отправлять в LLM батчи из похожих по длине промптов
+
+    Args:
+        texts: Тексты постов
+        bounds: Возрастающие границы корзин в токенах
+
+    Returns:
+        Непустые списки индексов texts, от коротких текстов к длинным
+    """
+    buckets: list[list[int]] = [[] for _ in range(len(bounds) + 1)]
+    for i, text in enumerate(texts):
+        buckets[bisect.bisect_right(bounds, len(text) // 4)].append(i)
+    return [bucket for bucket in buckets if bucket]
+
+
+def extract_relevance_days(response: str) -> int | None:
+    """
+    Извлекает количество дней актуальности из ответа LLM
+
+    Берется первая непрерывная последовательность цифр, результат ограничивается диапазоном от 1 до 10000.
+
+    Args:
+        response: Ответ LLM
+
+    Returns:
+        int | None: Количество дней актуальности или None, если в ответе нет числа
+    """
+    match = _DIGITS_RE.search(response)
+    if match is None:
+        return None
+
+    return max(1, min(10000, int(match.group(0))))
+
+
 async def determine_relevance_days(post_text: str, llm_provider: str = "qwen") -> tuple[int, str]:
     """
     Определяет количество дней актуальности поста через LLM
@@ -103,28 +152,17 @@ async def determine_relevance_days(post_text: str, llm_provider: str = "qwen") -
         raw_response = await llm_client.generate(
             messages=messages,
             temperature=0.0,
-            max_tokens=50,
+            max_tokens=RELEVANCE_MAX_TOKENS,
         )
         
         # Извлекаем число из ответа
         response = raw_response.strip()
-        # Удаляем все нецифровые символы, кроме минуса в начале
-        digits = ""
-        for char in response:
-            if char.isdigit():
-                digits += char
-            elif digits:  # Если уже начали собирать цифры, останавливаемся
-                break
-        
-        if not digits:
+        relevance_days = extract_relevance_days(response)
+
+        if relevance_days is None:
             logger.warning(f"⚠️ [relevance_analyzer] Не удалось извлечь число из ответа LLM: {response}, используем значение по умолчанию 30")
             return 30, raw_response
         
-        relevance_days = int(digits)
-        
-        # Ограничиваем диапазон от 1 до 10000
-        relevance_days = max(1, min(10000, relevance_days))
-        
         logger.info(f"✅ [relevance_analyzer] Определена актуальность: {relevance_days} дней для поста (длина: {len(post_text)} символов)")
         return relevance_days, raw_response
         
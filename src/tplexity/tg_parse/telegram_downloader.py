@@ -6,17 +6,348 @@
 """
 
 import asyncio
+import csv
 import json
+import logging
 import os
+import random
+import re
+from collections.abc import Callable
+from contextlib import ExitStack, contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from telethon import TelegramClient
-from telethon.sessions import StringSession
+from telethon.errors import FloodWaitError
+from telethon.sessions import SQLiteSession, StringSession
 from telethon.tl.types import Message
 
+logger = logging.getLogger(__name__)
+
+# Ссылка вида t.me/channel или telegram.me/channel (берется последний сегмент пути)
+_LINK_RE = re.compile(r"(?:t|telegram)\.me/(?:.*/)?@*([^/]+)/*$")
+
+# Поиск первого непробельного символа: проверка непустого текста без копии строки, как у strip()
+_HAS_NONSPACE = re.compile(r"\S").search
+
+# Таблица замены недопустимых в именах файлов символов на "_"
+_SANITIZE_TABLE = str.maketrans('<>:"/\\|?*', "_________")
+
+# Колонки сообщений в порядке _message_to_dict (media_path - при save_media)
+_MESSAGE_FIELDS = [
+    "id",
+    "link",
+    "date",
+    "text",
+    "views",
+    "forwards",
+    "edit_date",
+    "has_media",
+    "media_type",
+    "media_path",
+]
+
+# Сколько байт с конца файла читается для поиска закрывающей скобки JSON-массива
+_JSON_TAIL_SIZE = 4096
+
+# Потоковый разбор JSON-массива: размер блока чтения, декодер и разделители между элементами
+_JSON_CHUNK_SIZE = 1 << 20
+_JSON_DECODER = json.JSONDecoder()
+_JSON_ARRAY_SEPARATORS = re.compile(r"[\s,]*")
+# Ошибка разбора или конец значения не дальше этого числа символов от конца буфера может означать
+# обрезанный границей блока литерал, число или escape-последовательность; ошибка раньше - битый JSON
+_JSON_TRUNCATION_MARGIN = 8
+
+# Размер row group при потоковой записи Parquet
+_PARQUET_ROW_GROUP_SIZE = 65536
+
+# Фиксированная схема сообщений для Parquet (даты приходят строками ISO 8601 в UTC).
+# id, views и forwards в MTProto - 32-битные int, поэтому int32 без проверки диапазона;
+# media_type - один из ~15 типов медиа, хранится словарем с int8 индексами
+_PARQUET_SCHEMA = pa.schema(
+    [
+        ("id", pa.int32()),
+        ("link", pa.string()),
+        ("date", pa.timestamp("us", tz="UTC")),
+        ("text", pa.string()),
+        ("views", pa.int32()),
+        ("forwards", pa.int32()),
+        ("edit_date", pa.timestamp("us", tz="UTC")),
+        ("has_media", pa.bool_()),
+        ("media_type", pa.dictionary(pa.int8(), pa.string())),
+        ("media_path", pa.string()),
+    ]
+)
+
+
+def _dicts_to_arrow_table(data: list[dict[str, Any]]) -> pa.Table:
+    """
+    Собирает Arrow таблицу из списка сообщений по колонкам, без промежуточного DataFrame.
+
+    Args:
+        data: Список словарей с данными сообщений
+
+    Returns:
+        Таблица со схемой _PARQUET_SCHEMA
+    """
+    columns = {name: [] for name in _PARQUET_SCHEMA.names}
+    appends = [(name, columns[name].append) for name in _PARQUET_SCHEMA.names]
+    for msg in data:
+        for name, append in appends:
+            append(msg.get(name))
+
+    arrays = []
+    for field in _PARQUET_SCHEMA:
+        if pa.types.is_timestamp(field.type):
+            # Строки ISO 8601 разбираются векторно при приведении типа
+            arrays.append(pa.array(columns[field.name], type=pa.string()).cast(field.type))
+        else:
+            arrays.append(pa.array(columns[field.name], type=field.type))
+    return pa.Table.from_arrays(arrays, schema=_PARQUET_SCHEMA)
+
+
+@contextmanager
+def open_parquet_writer(filepath: Path, schema: pa.Schema = _PARQUET_SCHEMA):
+    """
+    Открывает потоковый ParquetWriter для записи сообщений батчами.
+
+    Args:
+        filepath: Путь к Parquet файлу (перезаписывается)
+        schema: Схема таблицы
+
+    Yields:
+        ParquetWriter, который закрывается при выходе из контекста
+    """
+    writer = pq.ParquetWriter(filepath, schema, compression="zstd", use_dictionary=["media_type"])
+    try:
+        yield writer
+    finally:
+        writer.close()
+
+
+def _jsonl_sink(stack: ExitStack, filepath: Path) -> Callable[[dict[str, Any]], None]:
+    """Возвращает функцию, дописывающую сообщение в JSONL файл (файл закрывается вместе со stack)."""
+    out_fp = stack.enter_context(open(filepath, "a", encoding="utf-8"))
+
+    def emit(message_dict: dict[str, Any]):
+        out_fp.write(json.dumps(message_dict, ensure_ascii=False) + "\n")
+
+    return emit
+
+
+def _csv_sink(stack: ExitStack, filepath: Path) -> Callable[[dict[str, Any]], None]:
+    """Возвращает функцию, записывающую сообщение строкой CSV (файл перезаписывается, закрывается вместе со stack)."""
+    out_fp = stack.enter_context(open(filepath, "w", encoding="utf-8", newline=""))
+    writer = csv.DictWriter(out_fp, fieldnames=_MESSAGE_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    return writer.writerow
+
+
+def _parquet_sink(stack: ExitStack, filepath: Path) -> Callable[[dict[str, Any]], None]:
+    """Возвращает функцию, буферизующую сообщения и пишущую их в Parquet по одной row group."""
+    writer = stack.enter_context(open_parquet_writer(filepath))
+    buffer: list[dict[str, Any]] = []
+
+    def flush():
+        if buffer:
+            writer.write_table(_dicts_to_arrow_table(buffer))
+            buffer.clear()
+
+    # Остаток буфера дописывается перед закрытием writer (callback выполнится раньше)
+    stack.callback(flush)
+
+    def emit(message_dict: dict[str, Any]):
+        buffer.append(message_dict)
+        if len(buffer) >= _PARQUET_ROW_GROUP_SIZE:
+            flush()
+
+    return emit
+
+
+def _load_file_session(session_name: str) -> StringSession:
+    """
+    Загружает авторизацию из файла сессии Telethon (SQLite) в StringSession.
+
+    Args:
+        session_name: Имя файла сессии (без расширения .session)
+
+    Returns:
+        Сессия в памяти (пустая, если файл не авторизован)
+    """
+    file_session = SQLiteSession(session_name)
+    try:
+        return StringSession(StringSession.save(file_session))
+    finally:
+        file_session.close()
+
+
+def _save_file_session(session: StringSession, session_name: str):
+    """
+    Записывает авторизацию из сессии в памяти обратно в файл сессии Telethon.
+
+    Args:
+        session: Сессия клиента
+        session_name: Имя файла сессии (без расширения .session)
+    """
+    if session.auth_key is None:
+        return
+
+    file_session = SQLiteSession(session_name)
+    try:
+        file_session.set_dc(session.dc_id, session.server_address, session.port)
+        file_session.auth_key = session.auth_key
+        file_session.save()
+    finally:
+        file_session.close()
+
+
+def load_jsonl(filepath: Path):
+    """
+    Построчно читает JSON Lines файл.
+
+    Args:
+        filepath: Путь к файлу (одно сообщение на строку)
+
+    Yields:
+        Словари с данными сообщений
+    """
+    with open(filepath, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _decode_json_item(buffer: str, pos: int, eof: bool) -> tuple[Any, int] | None:
+    """
+    Разбирает элемент JSON-массива из буфера потокового чтения.
+
+    Args:
+        buffer: Прочитанная часть файла
+        pos: Позиция начала элемента в buffer
+        eof: Прочитан ли файл до конца
+
+    Returns:
+        (элемент, позиция после него) или None, если элемент мог быть обрезан границей блока
+
+    Raises:
+        json.JSONDecodeError: Если элемент некорректен независимо от следующего блока
+    """
+    try:
+        item, end = _JSON_DECODER.raw_decode(buffer, pos)
+    except json.JSONDecodeError as e:
+        # Дочитываем следующий блок, только если ошибку объясняет обрезанный элемент,
+        # иначе битый элемент тянул бы в буфер весь оставшийся файл
+        truncated = e.msg.startswith("Unterminated string") or e.pos >= len(buffer) - _JSON_TRUNCATION_MARGIN
+        if eof or not truncated:
+            raise
+        return None
+
+    # Значение у самой границы блока (например, число "1.5e" от "1.5e-3") может продолжаться
+    if eof or end < len(buffer) - _JSON_TRUNCATION_MARGIN:
+        return item, end
+    return None
+
+
+def iter_json_array(filepath: Path):
+    """
+    Потоково разбирает JSON-массив, читая файл блоками.
+
+    В памяти одновременно находятся только текущий блок и один разобранный элемент.
+    Пустой файл или файл только из пробельных символов считается пустым массивом.
+
+    Args:
+        filepath: Путь к файлу с JSON-массивом
+
+    Yields:
+        Элементы массива по одному
+
+    Raises:
+        ValueError: Если файл не является корректным JSON-массивом
+    """
+    with open(filepath, encoding="utf-8") as f:
+        buffer = ""
+        while not buffer and (chunk := f.read(_JSON_CHUNK_SIZE)):
+            buffer = chunk.lstrip()
+        if not buffer:
+            return
+        if not buffer.startswith("["):
+            raise ValueError(f"Ожидался JSON-массив в {filepath}")
+        pos = 1
+        eof = False
+
+        while True:
+            pos = _JSON_ARRAY_SEPARATORS.match(buffer, pos).end()
+            if pos < len(buffer):
+                if buffer[pos] == "]":
+                    return
+                decoded = _decode_json_item(buffer, pos, eof)
+                if decoded is not None:
+                    item, pos = decoded
+                    yield item
+                    continue
+            elif eof:
+                raise ValueError(f"Незавершенный JSON-массив в {filepath}")
+
+            chunk = f.read(_JSON_CHUNK_SIZE)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+
+def append_to_json_array(filepath: Path, items: list[dict[str, Any]]):
+    """
+    Дописывает элементы в JSON-массив в файле, не перечитывая и не перезаписывая его целиком.
+
+    Переписывается только хвост файла начиная с закрывающей скобки, а результат побайтно
+    совпадает с json.dumps(..., ensure_ascii=False, indent=2) для объединенного массива.
+    К компактно записанному массиву элементы дописываются с отступами (JSON остается корректным).
+    Если файла нет или в нем только пробельные символы, массив создается заново.
+
+    Args:
+        filepath: Путь к файлу с JSON-массивом
+        items: Новые элементы массива
+
+    Raises:
+        ValueError: Если файл не заканчивается закрывающей скобкой массива (например, обрезан посреди элемента)
+    """
+    if not items:
+        return
+
+    items_json = ",\n".join(
+        "  " + json.dumps(item, ensure_ascii=False, indent=2).replace("\n", "\n  ") for item in items
+    )
+
+    # Ищем закрывающую скобку массива и последний символ перед ней
+    size = filepath.stat().st_size if filepath.exists() else 0
+    tail_start = max(0, size - _JSON_TAIL_SIZE)
+    tail = b""
+    if size:
+        with open(filepath, "rb") as f:
+            f.seek(tail_start)
+            tail = f.read()
+
+    if not tail_start and not tail.strip():
+        # Файла нет или в нем только пробельные символы - создаем массив заново
+        with open(filepath, "w", encoding="utf-8") as f:
+            f.write(f"[\n{items_json}\n]")
+        return
+
+    # После скобки допустимы только пробельные символы: "]" внутри строки элемента,
+    # обрезанного на середине, не должна приниматься за конец массива
+    bracket = tail.rfind(b"]")
+    if bracket < 0 or tail[bracket + 1 :].strip():
+        raise ValueError(f"Файл {filepath} не заканчивается JSON-массивом")
+    content_end = len(tail[:bracket].rstrip())
+    separator = "\n" if tail[:content_end].endswith(b"[") else ",\n"
+
+    with open(filepath, "r+b") as f:
+        f.seek(tail_start + content_end)
+        f.truncate()
+        f.write(f"{separator}{items_json}\n]".encode())
+
 
 class TelegramDownloader:
     """Класс для скачивания данных из Telegram каналов."""
@@ -34,9 +365,8 @@ class TelegramDownloader:
         """
         link = link.strip()
 
-        if "t.me/" in link or "telegram.me/" in link:
-            parts = link.rstrip("/").split("/")
-            return parts[-1].lstrip("@")
+        if match := _LINK_RE.search(link):
+            return match.group(1)
 
         if link.startswith("@"):
             return link[1:]
@@ -50,6 +380,7 @@ class TelegramDownloader:
         session_name: str = "telegram_session",
         session_string: str | None = None,
         download_path: str = "data/telegram",
+        in_memory_session: bool = False,
     ):
         """
         Инициализация клиента Telegram.
@@ -60,6 +391,10 @@ class TelegramDownloader:
             session_name: Имя файла сессии (используется если session_string не указан)
             session_string: Строка сессии (если указана, используется вместо файла)
             download_path: Путь для сохранения данных
+            in_memory_session: Загрузить файл сессии в память при старте и сохранить обратно
+                только в disconnect (без записи в SQLite во время скачивания). Кэш сущностей
+                из файла не загружается, а при аварийном завершении изменения сессии теряются.
+                Если файла сессии еще нет, используется обычная файловая сессия
         """
         self.api_id = api_id
         self.api_hash = api_hash
@@ -68,25 +403,54 @@ class TelegramDownloader:
         self.download_path = Path(download_path)
         self.download_path.mkdir(parents=True, exist_ok=True)
 
-        # Детальное логирование для отладки
-        print(f"🔍 [telegram_downloader.__init__] session_string получен: {session_string is not None}")
+        # Детальное логирование для отладки (значение session_string не логируем - это секрет)
+        logger.debug("🔍 [telegram_downloader.__init__] session_string получен: %s", session_string is not None)
         if session_string:
-            print(f"🔍 [telegram_downloader.__init__] session_string длина: {len(session_string)}")
-            print(f"🔍 [telegram_downloader.__init__] session_string первые 30 символов: {session_string[:30]}...")
-            print(f"🔍 [telegram_downloader.__init__] session_string пустая строка: {session_string == ''}")
+            logger.debug("🔍 [telegram_downloader.__init__] session_string длина: %d", len(session_string))
+            logger.debug("🔍 [telegram_downloader.__init__] session_string пустая строка: %s", session_string == "")
         else:
-            print(f"🔍 [telegram_downloader.__init__] session_string is None, будет использован файл: {session_name}")
+            logger.debug(
+                "🔍 [telegram_downloader.__init__] session_string is None, будет использован файл: %s", session_name
+            )
+
+        # Telethon добавляет расширение .session к имени файла, если его нет
+        session_file = Path(session_name if session_name.endswith(".session") else f"{session_name}.session")
+        use_session_string = bool(session_string and session_string.strip())
+
+        if in_memory_session and not use_session_string and not session_file.exists():
+            # SQLiteSession молча создал бы пустой файл, а авторизация прошла бы в сессии в памяти
+            logger.warning(
+                f"⚠️ [telegram_downloader.__init__] Файл сессии {session_file} не найден, "
+                "сессия в памяти не используется"
+            )
+            in_memory_session = False
 
         # ВАЖНО: session_string имеет приоритет над файлом
-        if session_string and session_string.strip():
-            print("✅ [telegram_downloader.__init__] Используется StringSession (строка сессии)")
+        if use_session_string:
+            logger.info("✅ [telegram_downloader.__init__] Используется StringSession (строка сессии)")
             session = StringSession(session_string)
+        elif in_memory_session:
+            logger.info(f"📁 [telegram_downloader.__init__] Файл сессии {session_file} загружен в память")
+            session = _load_file_session(session_name)
         else:
-            print(f"📁 [telegram_downloader.__init__] Используется файл сессии: {session_name}")
+            logger.info(f"📁 [telegram_downloader.__init__] Используется файл сессии: {session_name}")
             session = session_name
 
+        # Сессию из памяти нужно записать обратно в файл при отключении
+        self._persist_session = in_memory_session and not use_session_string
+
         self.client = TelegramClient(session, api_id, api_hash)
 
+        # Созданные папки каналов по username (без повторных mkdir и построения пути при каждом сохранении)
+        self._folder_cache: dict[str, Path] = {}
+
+        # Кэш сущностей каналов: get_entity - сетевой запрос, а канал запрашивается несколько раз
+        self._entity_cache: dict[str, Any] = {}
+
+        # Момент (по часам event loop), до которого действует FloodWait. Общий для всех каналов:
+        # ограничение накладывается на аккаунт, поэтому ждут и итераторы сообщений, и загрузки медиа
+        self._flood_until = 0.0
+
     async def connect(self, max_retries: int = 3):
         """
         Подключение к Telegram с повторными попытками.
@@ -100,41 +464,38 @@ class TelegramDownloader:
             if self.session_string
             else f"файл: {self.session_name}"
         )
-        print(f"🔌 [telegram_downloader] Подключение к Telegram (сессия: {session_info})")
+        logger.info(f"🔌 [telegram_downloader] Подключение к Telegram (сессия: {session_info})")
 
         for attempt in range(max_retries):
             try:
-                print(f"🔄 [telegram_downloader] Попытка подключения {attempt + 1}/{max_retries}...")
+                logger.info(f"🔄 [telegram_downloader] Попытка подключения {attempt + 1}/{max_retries}...")
                 await self.client.connect()
-                print("✅ [telegram_downloader] Соединение установлено")
+                logger.info("✅ [telegram_downloader] Соединение установлено")
 
                 is_authorized = await self.client.is_user_authorized()
-                print(f"🔍 [telegram_downloader] Статус авторизации: {is_authorized}")
+                logger.info(f"🔍 [telegram_downloader] Статус авторизации: {is_authorized}")
 
                 if not is_authorized:
-                    print("❌ [telegram_downloader] Ошибка: Сессия не авторизована")
-                    print(f"📋 [telegram_downloader] Используется: {session_info}")
-                    print("💡 [telegram_downloader] Используйте authorize_telegram.py для создания новой сессии")
+                    logger.error("❌ [telegram_downloader] Ошибка: Сессия не авторизована")
+                    logger.error(f"📋 [telegram_downloader] Используется: {session_info}")
+                    logger.error("💡 [telegram_downloader] Используйте authorize_telegram.py для создания новой сессии")
                     return False
 
-                print("✅ [telegram_downloader] Подключено к Telegram и авторизовано")
+                logger.info("✅ [telegram_downloader] Подключено к Telegram и авторизовано")
                 return True
             except Exception as e:
-                error_type = type(e).__name__
-                error_msg = str(e)
-                print(f"❌ [telegram_downloader] Попытка {attempt + 1} не удалась")
-                print(f"   Тип ошибки: {error_type}")
-                print(f"   Сообщение: {error_msg}")
+                logger.warning(
+                    f"❌ [telegram_downloader] Попытка {attempt + 1} не удалась: {type(e).__name__}: {e}"
+                )
 
                 if attempt < max_retries - 1:
-                    print("⏳ [telegram_downloader] Повторная попытка через 2 секунды...")
+                    logger.info("⏳ [telegram_downloader] Повторная попытка через 2 секунды...")
                     await asyncio.sleep(2)
                 else:
-                    print(f"❌ [telegram_downloader] Не удалось подключиться после {max_retries} попыток")
-                    import traceback
-
-                    print("📋 [telegram_downloader] Полный traceback:")
-                    traceback.print_exc()
+                    logger.error(
+                        f"❌ [telegram_downloader] Не удалось подключиться после {max_retries} попыток",
+                        exc_info=True,
+                    )
                     return False
 
     async def disconnect(self):
@@ -142,9 +503,32 @@ class TelegramDownloader:
         try:
             if self.client.is_connected():
                 await self.client.disconnect()
-                print("Отключено от Telegram")
+                logger.info("Отключено от Telegram")
         except Exception as e:
-            print(f"Ошибка при отключении: {e}")
+            logger.error(f"Ошибка при отключении: {e}")
+
+        if self._persist_session:
+            try:
+                _save_file_session(self.client.session, self.session_name)
+            except Exception as e:
+                logger.error(f"Ошибка при сохранении сессии в файл {self.session_name}: {e}")
+
+    async def _get_entity(self, channel_username: str) -> Any:
+        """
+        Получить сущность канала с кэшированием по username.
+
+        Args:
+            channel_username: Username канала (без @) или ссылка
+
+        Returns:
+            Сущность канала Telethon
+        """
+        key = self.parse_channel_link(channel_username).lower()
+        entity = self._entity_cache.get(key)
+        if entity is None:
+            entity = await self.client.get_entity(channel_username)
+            self._entity_cache[key] = entity
+        return entity
 
     async def get_channel_info(self, channel_username: str) -> dict[str, Any]:
         """
@@ -156,7 +540,7 @@ class TelegramDownloader:
         Returns:
             Словарь с информацией о канале
         """
-        channel = await self.client.get_entity(channel_username)
+        channel = await self._get_entity(channel_username)
 
         info = {
             "id": channel.id,
@@ -168,7 +552,13 @@ class TelegramDownloader:
 
         return info
 
-    async def download_messages(
+    async def _wait_flood(self):
+        """Дождаться окончания FloodWait (дедлайн может продлеваться другими каналами во время ожидания)."""
+        loop = asyncio.get_running_loop()
+        while (delay := self._flood_until - loop.time()) > 0:
+            await asyncio.sleep(delay)
+
+    async def download_messages(  # noqa: C901
         self,
         channel_username: str,
         limit: int | None = None,
@@ -177,10 +567,22 @@ class TelegramDownloader:
         max_id: int = 0,
         reverse: bool = False,
         save_media: bool = False,
+        max_concurrent_media: int = 10,
+        output_file: Path | None = None,
     ) -> list[dict[str, Any]]:
         """
         Скачать сообщения из канала.
 
+        Медиа скачиваются параллельно в фоновых задачах (не более max_concurrent_media
+        одновременно), не блокируя итерацию по сообщениям. При FloodWaitError скачивание
+        приостанавливается на требуемое время и продолжается с последнего полученного сообщения.
+
+        Если указан output_file, сообщения не накапливаются в памяти, а сразу записываются в файл:
+        для .parquet - батчами по _PARQUET_ROW_GROUP_SIZE строк, для .csv - построчно (оба файла
+        перезаписываются), для остальных расширений - дописываются в формате JSON Lines
+        (прочитать можно через load_jsonl).
+        Сообщения с медиа записываются после скачивания медиа, поэтому их порядок может отличаться.
+
         Args:
             channel_username: Username канала (без @) или ссылка
             limit: Максимальное количество сообщений (None = все)
@@ -189,53 +591,110 @@ class TelegramDownloader:
             max_id: Максимальный ID сообщения
             reverse: Скачивать в обратном порядке (от старых к новым)
             save_media: Сохранять медиа файлы
+            max_concurrent_media: Максимальное количество одновременных скачиваний медиа
+            output_file: Путь к JSONL, CSV или Parquet файлу для потоковой записи (None = вернуть список)
 
         Returns:
-            Список словарей с данными сообщений
+            Список словарей с данными сообщений (пустой, если указан output_file)
         """
-        print(f"Скачивание сообщений из канала: {channel_username}")
+        logger.info(f"Скачивание сообщений из канала: {channel_username}")
 
-        channel = await self.client.get_entity(channel_username)
+        channel = await self._get_entity(channel_username)
         messages_data = []
 
-        channel_folder = self.download_path / self._sanitize_filename(channel_username)
-        channel_folder.mkdir(exist_ok=True)
+        channel_folder = self._ensure_folder(channel_username)
 
         if save_media:
             media_folder = channel_folder / "media"
             media_folder.mkdir(exist_ok=True)
 
-        count = 0
-        async for message in self.client.iter_messages(
-            channel,
-            limit=limit,
-            offset_date=offset_date,
-            min_id=min_id,
-            max_id=max_id,
-            reverse=reverse,
-        ):
-            if not isinstance(message, Message):
-                continue
-
-            count += 1
-            if limit and count % 10 == 0:
-                print(f"  Скачано {count}/{limit} сообщений...")
-            elif not limit and count % 100 == 0:
-                print(f"  Скачано {count} сообщений...")
-
-            message_dict = await self._message_to_dict(message, channel_username)
-
-            if save_media and message.media:
+        streaming = output_file is not None
+
+        # Telegram обрабатывает ~10 параллельных загрузок, поэтому ограничиваем их семафором
+        media_semaphore = asyncio.Semaphore(max_concurrent_media)
+        media_tasks: list[asyncio.Task] = []
+
+        async def download_media(message: Message, message_dict: dict[str, Any]):
+            async with media_semaphore:
+                # Во время FloodWait не начинаем новые загрузки
+                await self._wait_flood()
                 try:
-                    media_path = await message.download_media(file=str(media_folder / f"{message.id}"))
-                    message_dict["media_path"] = media_path
+                    message_dict["media_path"] = await message.download_media(file=str(media_folder / f"{message.id}"))
                 except Exception as e:
-                    print(f"Ошибка при скачивании медиа {message.id}: {e}")
+                    logger.error("Ошибка при скачивании медиа %s: %s", message.id, e)
                     message_dict["media_path"] = None
+            if streaming:
+                emit(message_dict)
 
-            messages_data.append(message_dict)
+        loop = asyncio.get_running_loop()
+        count = 0
+        with ExitStack() as stack:
+            if not streaming:
+                emit = messages_data.append
+            elif Path(output_file).suffix == ".parquet":
+                emit = _parquet_sink(stack, output_file)
+            elif Path(output_file).suffix == ".csv":
+                emit = _csv_sink(stack, output_file)
+            else:
+                emit = _jsonl_sink(stack, output_file)
 
-        print(f"Скачано {len(messages_data)} сообщений")
+            try:
+                # При FloodWait продолжаем с последнего полученного сообщения (offset_id исключающий)
+                last_id = 0
+                fetched = 0
+                while True:
+                    try:
+                        async for message in self.client.iter_messages(
+                            channel,
+                            limit=limit - fetched if limit else limit,
+                            offset_date=offset_date,
+                            offset_id=last_id,
+                            min_id=min_id,
+                            max_id=max_id,
+                            reverse=reverse,
+                        ):
+                            # FloodWait другого канала: приостанавливаем итератор до следующего запроса к API
+                            if self._flood_until > loop.time():
+                                await self._wait_flood()
+
+                            last_id = message.id
+                            fetched += 1
+                            if not isinstance(message, Message):
+                                continue
+
+                            count += 1
+                            # Прогресс на степенях двойки: O(log N) строк лога вместо O(N)
+                            if count & (count - 1) == 0:
+                                logger.info("  Скачано %d%s сообщений...", count, f"/{limit}" if limit else "")
+
+                            message_dict = await self._message_to_dict(message, channel_username)
+
+                            if save_media and message.media:
+                                # Словарь дополняется media_path на месте, порядок сообщений в списке сохраняется
+                                media_tasks.append(asyncio.create_task(download_media(message, message_dict)))
+                                if streaming:
+                                    continue  # В файл сообщение запишет задача после скачивания медиа
+
+                            emit(message_dict)
+                        break
+                    except FloodWaitError as e:
+                        # Джиттер не криптографический: только разносит повторные запросы во времени
+                        delay = e.seconds + random.uniform(0, 1)  # noqa: S311
+                        logger.warning(
+                            f"⏳ [telegram_downloader] FloodWait: пауза {delay:.1f} сек (скачано {count} сообщений)"
+                        )
+                        self._flood_until = max(self._flood_until, loop.time() + delay)
+                        await self._wait_flood()
+
+                if media_tasks:
+                    await asyncio.gather(*media_tasks)
+            finally:
+                # При ошибке или отмене не оставляем фоновые загрузки медиа писать в уже закрытый файл
+                for task in media_tasks:
+                    task.cancel()
+                await asyncio.gather(*media_tasks, return_exceptions=True)
+
+        logger.info(f"Скачано {count} сообщений")
 
         return messages_data
 
@@ -255,16 +714,19 @@ class TelegramDownloader:
             clean_username = channel_username.lstrip("@")
             message_link = f"https://t.me/{clean_username}/{message.id}"
 
+        date = message.date
+        edit_date = message.edit_date
+        media = message.media
         return {
             "id": message.id,
             "link": message_link,
-            "date": message.date.isoformat() if message.date else None,
+            "date": date.isoformat() if date else None,
             "text": message.text,
             "views": message.views,
             "forwards": message.forwards,
-            "edit_date": message.edit_date.isoformat() if message.edit_date else None,
-            "has_media": message.media is not None,
-            "media_type": type(message.media).__name__ if message.media else None,
+            "edit_date": edit_date.isoformat() if edit_date else None,
+            "has_media": media is not None,
+            "media_type": type(media).__name__ if media else None,
         }
 
     @staticmethod
@@ -278,10 +740,10 @@ class TelegramDownloader:
         Returns:
             Отфильтрованный список сообщений
         """
-        filtered = [msg for msg in messages if msg.get("text") and msg["text"].strip()]
+        filtered = [msg for msg in messages if (text := msg.get("text")) and _HAS_NONSPACE(text)]
         removed_count = len(messages) - len(filtered)
         if removed_count > 0:
-            print(f"  Удалено {removed_count} сообщений с пустым текстом")
+            logger.info(f"  Удалено {removed_count} сообщений с пустым текстом")
         return filtered
 
     def save_to_json(
@@ -290,6 +752,7 @@ class TelegramDownloader:
         channel_username: str,
         filename: str | None = None,
         filter_empty: bool = False,
+        pretty: bool = True,
     ):
         """
         Сохранить данные в JSON файл.
@@ -299,12 +762,12 @@ class TelegramDownloader:
             channel_username: Username канала
             filename: Имя файла (если None, будет сгенерировано автоматически)
             filter_empty: Удалять ли сообщения с пустым текстом
+            pretty: Форматировать JSON с отступами (False = компактная запись, быстрее и меньше)
         """
         if filter_empty:
             data = self.filter_empty_messages(data)
 
-        channel_folder = self.download_path / self._sanitize_filename(channel_username)
-        channel_folder.mkdir(exist_ok=True)
+        channel_folder = self._ensure_folder(channel_username)
 
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -312,10 +775,11 @@ class TelegramDownloader:
 
         filepath = channel_folder / filename
 
+        # json.dumps (в отличие от json.dump в файл) без indent использует C-энкодер за один проход
         with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write(json.dumps(data, ensure_ascii=False, indent=2 if pretty else None))
 
-        print(f"Данные сохранены в {filepath}")
+        logger.info(f"Данные сохранены в {filepath}")
         return filepath
 
     def append_to_json(
@@ -326,22 +790,30 @@ class TelegramDownloader:
         """
         Добавить новые данные к существующему JSON файлу.
 
+        Файл не перечитывается целиком: JSON Lines файл дописывается в конец, а у JSON-массива
+        переписывается только закрывающая скобка. Форматирование массива совпадает с save_to_json(pretty=True).
+
         Args:
             new_data: Список новых сообщений
-            filepath: Путь к существующему JSON файлу
+            filepath: Путь к существующему JSON (массив) или JSONL файлу
         """
-        if filepath.exists():
-            with open(filepath, encoding="utf-8") as f:
-                existing_data = json.load(f)
-        else:
-            existing_data = []
+        size = filepath.stat().st_size if filepath.exists() else 0
 
-        existing_data.extend(new_data)
+        if size == 0:
+            with open(filepath, "w", encoding="utf-8") as f:
+                json.dump(new_data, f, ensure_ascii=False, indent=2)
+        elif new_data:
+            # Формат определяем по первому значимому байту: '[' - массив, '{' - JSON Lines
+            with open(filepath, "rb") as f:
+                is_array = f.read(64).lstrip().startswith(b"[")
 
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(existing_data, f, ensure_ascii=False, indent=2)
+            if is_array:
+                append_to_json_array(filepath, new_data)
+            else:
+                with open(filepath, "ab") as f:
+                    f.writelines((json.dumps(item, ensure_ascii=False) + "\n").encode() for item in new_data)
 
-        print(f"Добавлено {len(new_data)} новых сообщений в {filepath}")
+        logger.info(f"Добавлено {len(new_data)} новых сообщений в {filepath}")
 
     def save_to_csv(
         self,
@@ -362,8 +834,7 @@ class TelegramDownloader:
         if filter_empty:
             data = self.filter_empty_messages(data)
 
-        channel_folder = self.download_path / self._sanitize_filename(channel_username)
-        channel_folder.mkdir(exist_ok=True)
+        channel_folder = self._ensure_folder(channel_username)
 
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -371,10 +842,12 @@ class TelegramDownloader:
 
         filepath = channel_folder / filename
 
-        df = pd.DataFrame(data)
-        df.to_csv(filepath, index=False, encoding="utf-8")
+        with open(filepath, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=_MESSAGE_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(data)
 
-        print(f"Данные сохранены в {filepath}")
+        logger.info(f"Данные сохранены в {filepath}")
 
     def save_to_parquet(
         self,
@@ -395,8 +868,7 @@ class TelegramDownloader:
         if filter_empty:
             data = self.filter_empty_messages(data)
 
-        channel_folder = self.download_path / self._sanitize_filename(channel_username)
-        channel_folder.mkdir(exist_ok=True)
+        channel_folder = self._ensure_folder(channel_username)
 
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -404,10 +876,29 @@ class TelegramDownloader:
 
         filepath = channel_folder / filename
 
-        df = pd.DataFrame(data)
-        df.to_parquet(filepath, index=False)
+        # Конвертируем и пишем по одной row group, чтобы не держать в памяти всю Arrow таблицу
+        with open_parquet_writer(filepath) as writer:
+            for start in range(0, len(data), _PARQUET_ROW_GROUP_SIZE):
+                writer.write_table(_dicts_to_arrow_table(data[start : start + _PARQUET_ROW_GROUP_SIZE]))
+
+        logger.info(f"Данные сохранены в {filepath}")
+
+    def _ensure_folder(self, channel_username: str) -> Path:
+        """
+        Получить папку канала, создав ее при первом обращении.
+
+        Args:
+            channel_username: Username канала
 
-        print(f"Данные сохранены в {filepath}")
+        Returns:
+            Путь к папке канала
+        """
+        channel_folder = self._folder_cache.get(channel_username)
+        if channel_folder is None:
+            channel_folder = self.download_path / self._sanitize_filename(channel_username)
+            channel_folder.mkdir(parents=True, exist_ok=True)
+            self._folder_cache[channel_username] = channel_folder
+        return channel_folder
 
     @staticmethod
     def _sanitize_filename(filename: str) -> str:
@@ -420,11 +911,7 @@ class TelegramDownloader:
         Returns:
             Очищенное имя файла
         """
-        filename = filename.lstrip("@")
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, "_")
-        return filename
+        return filename.lstrip("@").translate(_SANITIZE_TABLE)
 
     async def download_multiple_channels(
         self,
@@ -432,50 +919,58 @@ class TelegramDownloader:
         limit: int | None = None,
         save_format: str = "json",
         save_media: bool = False,
+        max_concurrent_channels: int = 4,
     ):
         """
         Скачать сообщения из нескольких каналов.
 
+        Каналы обрабатываются параллельно (не более max_concurrent_channels одновременно),
+        ошибка в одном канале не прерывает остальные.
+
         Args:
             channel_usernames: Список username каналов
             limit: Максимальное количество сообщений из каждого канала
             save_format: Формат сохранения ('json', 'csv', 'parquet')
             save_media: Сохранять медиа файлы
+            max_concurrent_channels: Максимальное количество одновременно скачиваемых каналов
         """
-        for channel in channel_usernames:
-            try:
-                print(f"\n{'='*60}")
-                print(f"Обработка канала: {channel}")
-                print(f"{'='*60}")
+        savers = {"json": self.save_to_json, "csv": self.save_to_csv, "parquet": self.save_to_parquet}
+        if save_format not in savers:
+            raise ValueError(f"Неподдерживаемый формат: {save_format}")
+        save = savers[save_format]
+
+        semaphore = asyncio.Semaphore(max_concurrent_channels)
+
+        async def process_channel(channel: str):
+            async with semaphore:
+                logger.info(f"Обработка канала: {channel}")
 
                 info = await self.get_channel_info(channel)
-                print(f"Канал: {info.get('title', channel)}")
-                print(f"Подписчиков: {info.get('participants_count', 'N/A')}")
+                logger.info(
+                    f"Канал: {info.get('title', channel)} "
+                    f"(подписчиков: {info.get('participants_count', 'N/A')})"
+                )
 
                 messages = await self.download_messages(
                     channel,
                     limit=limit,
                     save_media=save_media,
                 )
+                save(messages, channel)
 
-                if save_format == "json":
-                    self.save_to_json(messages, channel)
-                elif save_format == "csv":
-                    self.save_to_csv(messages, channel)
-                elif save_format == "parquet":
-                    self.save_to_parquet(messages, channel)
-                else:
-                    raise ValueError(f"Неподдерживаемый формат: {save_format}")
-
-            except Exception as e:
-                print(f"Ошибка при обработке канала {channel}: {e}")
-                continue
+        results = await asyncio.gather(
+            *(process_channel(channel) for channel in channel_usernames), return_exceptions=True
+        )
+        for channel, result in zip(channel_usernames, results, strict=True):
+            if isinstance(result, Exception):
+                logger.error(f"Ошибка при обработке канала {channel}: {result}")
 
 
 async def main():
     """Пример использования."""
     from dotenv import load_dotenv
 
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     load_dotenv()
 
     api_id = int(os.getenv("TELEGRAM_API_ID", "0"))
@@ -9,13 +9,24 @@ import asyncio
 import json
 import logging
 import sys
+from collections.abc import Iterable
 from pathlib import Path
 
-# Добавляем корень проекта в путь
+import aiofiles
+
 project_root = Path(__file__).parent.parent.parent.parent
-sys.path.insert(0, str(project_root))
+# Добавляем корень проекта в путь только при запуске как скрипта, импорт модуля sys.path не меняет
+if __name__ == "__main__" and str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
-from tplexity.tg_parse.config import Settings
+from tplexity.llm_client import LLMResponseCache, get_llm  # noqa: E402
+from tplexity.tg_parse.config import settings  # noqa: E402
+from tplexity.tg_parse.relevance_analyzer import (  # noqa: E402
+    RELEVANCE_MAX_TOKENS,
+    RELEVANCE_PROMPT,
+    bucket_by_length,
+)
+from tplexity.tg_parse.telegram_downloader import iter_json_array  # noqa: E402
 
 # Настройка логирования
 logging.basicConfig(
@@ -24,6 +35,44 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Количество постов для тестирования
+POSTS_TO_TEST = 5
+
+# Файлы больше этого размера разбираются потоково, не загружая весь JSON в память
+STREAM_PARSE_MIN_SIZE = 5_000_000
+
+
+def _iter_text_posts(posts: Iterable[dict]):
+    """Возвращает посты с непустым текстом по одному (только id, text и date, текст без пробелов по краям)"""
+    for post in posts:
+        text = (post.get("text") or "").strip()
+        if text:
+            yield {"id": post.get("id"), "text": text, "date": post.get("date")}
+
+
+def _load_posts(messages_file: Path) -> tuple[int, list[dict]]:
+    """
+    Читает файл messages_monitor.json и отбирает посты с текстом для тестирования
+
+    Большие файлы разбираются потоково: в памяти одновременно один разобранный пост
+    и не больше POSTS_TO_TEST отобранных.
+
+    Returns:
+        (количество постов с текстом в файле, первые POSTS_TO_TEST из них)
+    """
+    if messages_file.stat().st_size < STREAM_PARSE_MIN_SIZE:
+        posts = json.loads(messages_file.read_bytes())
+    else:
+        posts = iter_json_array(messages_file)
+
+    count = 0
+    selected_posts = []
+    for post in _iter_text_posts(posts):
+        count += 1
+        if len(selected_posts) < POSTS_TO_TEST:
+            selected_posts.append(post)
+    return count, selected_posts
+
 
 async def test_llm_on_posts():
     """Тестирует LLM на определении актуальности постов"""
@@ -31,8 +80,8 @@ async def test_llm_on_posts():
     logger.info("🧪 [test_llm_relevance] Начало тестирования LLM на постах")
     logger.info("=" * 80)
 
-    # Загружаем конфигурацию
-    config = Settings()
+    # Общий экземпляр настроек модуля config, без повторного чтения окружения
+    config = settings
     
     # Определяем путь к данным
     data_dir = project_root / config.data_dir
@@ -54,26 +103,39 @@ async def test_llm_on_posts():
     active_channels = config.get_channels_list()
     logger.info(f"📋 [test_llm_relevance] Активные каналы из конфига: {active_channels}")
     
-    # Собираем посты только из активных каналов, группируя по каналам
-    posts_by_channel = {}
+    # Фильтруем только активные каналы (до чтения файлов)
+    channel_files = []
     for messages_file in messages_files:
         channel_name = messages_file.parent.name
-        
-        # Фильтруем только активные каналы
         if active_channels and channel_name not in active_channels:
             logger.debug(f"   Пропущен канал {channel_name} (не в списке активных)")
             continue
-        
-        try:
-            with open(messages_file, encoding="utf-8") as f:
-                posts = json.load(f)
-                for post in posts:
-                    post["source_channel"] = channel_name
-                    post["source_file"] = str(messages_file)
-                posts_by_channel[channel_name] = posts
-                logger.info(f"   Загружено {len(posts)} постов из {channel_name}")
-        except Exception as e:
-            logger.error(f"❌ [test_llm_relevance] Ошибка при загрузке {messages_file}: {e}")
+        file_size = messages_file.stat().st_size
+        if file_size == 0:
+            logger.debug(f"   Пропущен канал {channel_name} (пустой файл)")
+            continue
+        logger.debug(f"   Канал {channel_name}: {file_size} байт")
+        channel_files.append((channel_name, messages_file))
+
+    # Читаем и парсим файлы параллельно в пуле потоков, не блокируя event loop
+    loaded = await asyncio.gather(
+        *(asyncio.to_thread(_load_posts, messages_file) for _, messages_file in channel_files),
+        return_exceptions=True,
+    )
+
+    # Собираем посты только из активных каналов, группируя по каналам (количество постов с текстом и отобранные)
+    posts_by_channel = {}
+    for (channel_name, messages_file), result in zip(channel_files, loaded, strict=True):
+        if isinstance(result, Exception):
+            logger.error(f"❌ [test_llm_relevance] Ошибка при загрузке {messages_file}: {result}")
+            continue
+
+        count, posts = result
+        for post in posts:
+            post["source_channel"] = channel_name
+            post["source_file"] = str(messages_file)
+        posts_by_channel[channel_name] = (count, posts)
+        logger.info(f"   Загружено {count} постов с текстом из {channel_name}")
     
     if not posts_by_channel:
         logger.error("❌ [test_llm_relevance] Не найдено постов из активных каналов для тестирования")
@@ -84,7 +146,7 @@ async def test_llm_on_posts():
     sorted_channels = sorted(posts_by_channel.keys())
     logger.info(f"📊 [test_llm_relevance] Найдено активных каналов с постами: {len(sorted_channels)}")
     for i, channel in enumerate(sorted_channels, 1):
-        logger.info(f"   {i}. {channel}: {len(posts_by_channel[channel])} постов")
+        logger.info(f"   {i}. {channel}: {posts_by_channel[channel][0]} постов")
     
     # Берем посты из второго канала
     if len(sorted_channels) < 2:
@@ -95,81 +157,83 @@ async def test_llm_on_posts():
     
     logger.info(f"📝 [test_llm_relevance] Выбран канал: {selected_channel}")
     
-    # Берем первые 5 постов с текстом из выбранного канала
-    posts_with_text = [
-        post for post in posts_by_channel[selected_channel]
-        if post.get("text") and post.get("text").strip()
-    ]
-    
-    if len(posts_with_text) < 5:
-        logger.warning(f"⚠️ [test_llm_relevance] В канале {selected_channel} найдено только {len(posts_with_text)} постов с текстом, будет использовано {len(posts_with_text)}")
-        selected_posts = posts_with_text
-    else:
-        selected_posts = posts_with_text[:5]
+    # Первые посты с текстом из выбранного канала (отобраны при загрузке)
+    selected_posts = posts_by_channel[selected_channel][1]
+
+    if len(selected_posts) < POSTS_TO_TEST:
+        logger.warning(f"⚠️ [test_llm_relevance] В канале {selected_channel} найдено только {len(selected_posts)} постов с текстом, будет использовано {len(selected_posts)}")
     
     logger.info(f"📝 [test_llm_relevance] Выбрано {len(selected_posts)} постов для тестирования")
     
-    # Результаты
+    # Один клиент (и пул соединений) на все запросы
+    llm_client = get_llm(config.llm_provider)
+    # При temperature=0 ответ детерминирован, повторные прогоны берут его из кэша
+    cache = LLMResponseCache(project_root / ".cache" / "llm")
+
+    post_texts = [post["text"] for post in selected_posts]
+    messages_list = [
+        [
+            {
+                "role": "user",
+                "content": RELEVANCE_PROMPT.format(post_text=post_text),
+            }
+        ]
+        for post_text in post_texts
+    ]
+
+    cache_keys = [
+        cache.key(llm_client.model, messages, temperature=0.0, max_tokens=RELEVANCE_MAX_TOKENS)
+        for messages in messages_list
+    ]
+    responses = [cache.get(key) for key in cache_keys]
+    missing = [i for i, response in enumerate(responses) if response is None]
+    logger.info(f"💾 [test_llm_relevance] Ответов в кэше: {len(responses) - len(missing)}/{len(responses)}")
+
+    # Отправляем посты без ответа в кэше пакетами из похожих по длине промптов,
+    # чтобы короткие запросы не ждали длинные (не более 5 одновременных запросов - лимиты провайдера)
+    for bucket in bucket_by_length([post_texts[i] for i in missing]):
+        bucket_indices = [missing[j] for j in bucket]
+        fresh_responses = await llm_client.batch_generate(
+            [messages_list[i] for i in bucket_indices],
+            temperature=0.0,
+            max_tokens=RELEVANCE_MAX_TOKENS,
+            max_concurrency=5,
+            return_exceptions=True,
+        )
+        for i, response in zip(bucket_indices, fresh_responses, strict=True):
+            responses[i] = response
+            if not isinstance(response, BaseException):
+                cache.set(cache_keys[i], response)
+
     results = []
-    
-    # Прогоняем каждый пост через LLM
-    for i, post in enumerate(selected_posts, 1):
-        post_text = post.get("text", "").strip()
-        post_id = post.get("id", f"unknown_{i}")
-        channel = post.get("source_channel", "unknown")
-        
+    for i, (post, post_text, response) in enumerate(zip(selected_posts, post_texts, responses, strict=True), 1):
+        result = {
+            "post_number": i,
+            "post_id": post.get("id", f"unknown_{i}"),
+            "channel": post.get("source_channel", "unknown"),
+            "post_text": post_text,
+        }
+        if isinstance(response, BaseException):
+            logger.error(
+                f"❌ [test_llm_relevance] Ошибка при обработке поста {i}: {response}",
+                exc_info=response,
+            )
+            result["llm_response"] = f"ERROR: {str(response)}"
+            result["relevance_days"] = None
+        else:
+            result["llm_response"] = response.strip()
+        results.append(result)
+
+    for result in results:
         logger.info("=" * 80)
-        logger.info(f"📊 [test_llm_relevance] Пост {i}/{len(selected_posts)}")
-        logger.info(f"   ID: {post_id}")
-        logger.info(f"   Канал: {channel}")
-        logger.info(f"   Длина текста: {len(post_text)} символов")
-        logger.info(f"   Текст (первые 200 символов): {post_text[:200]}...")
+        logger.info(f"📊 [test_llm_relevance] Пост {result['post_number']}/{len(selected_posts)}")
+        logger.info(f"   ID: {result['post_id']}")
+        logger.info(f"   Канал: {result['channel']}")
+        logger.info(f"   Длина текста: {len(result['post_text'])} символов")
+        logger.info(f"   Текст (первые 200 символов): {result['post_text'][:200]}...")
+        logger.info(f"   Ответ LLM: {result['llm_response']}")
         logger.info("=" * 80)
-        
-        try:
-            # Получаем полный ответ LLM напрямую
-            from tplexity.llm_client import get_llm
-            from tplexity.tg_parse.relevance_analyzer import RELEVANCE_PROMPT
-            
-            llm_client = get_llm(config.llm_provider)
-            messages = [
-                {
-                    "role": "user",
-                    "content": RELEVANCE_PROMPT.format(post_text=post_text),
-                }
-            ]
-            
-            raw_llm_response = await llm_client.generate(
-                messages=messages,
-                temperature=0.0,
-                max_tokens=50,
-            )
-            
-            result = {
-                "post_number": i,
-                "post_id": post_id,
-                "channel": channel,
-                "post_text": post_text,
-                "llm_response": raw_llm_response.strip(),
-            }
-            
-            results.append(result)
-            
-            logger.info(f"✅ [test_llm_relevance] Пост {i} обработан:")
-            logger.info(f"   Ответ LLM: {raw_llm_response.strip()}")
-            
-        except Exception as e:
-            logger.error(f"❌ [test_llm_relevance] Ошибка при обработке поста {i}: {e}", exc_info=True)
-            result = {
-                "post_number": i,
-                "post_id": post_id,
-                "channel": channel,
-                "post_text": post_text,
-                "llm_response": f"ERROR: {str(e)}",
-                "relevance_days": None,
-            }
-            results.append(result)
-    
+
     # Сохраняем результаты в JSON файл
     output_file = project_root / "llm_relevance_test_results.json"
     
@@ -177,8 +241,9 @@ async def test_llm_on_posts():
     logger.info(f"💾 [test_llm_relevance] Сохранение результатов в {output_file}")
     logger.info("=" * 80)
     
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    # Сериализуем одной строкой и пишем без блокировки event loop
+    async with aiofiles.open(output_file, "w", encoding="utf-8") as f:
+        await f.write(json.dumps(results, ensure_ascii=False, indent=2))
     
     logger.info(f"✅ [test_llm_relevance] Результаты сохранены в {output_file}")
     logger.info(f"   Обработано постов: {len(results)}")
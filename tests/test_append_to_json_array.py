@@ -0,0 +1,136 @@
+import json
+
+import pytest
+
+from tplexity.tg_parse.telegram_downloader import append_to_json_array
+
+POSTS = [
+    {"id": 1, "text": "Первый пост", "views": 10},
+    {"id": 2, "text": "Второй\nпост со строками", "media_type": None},
+]
+
+NESTED_POSTS = [
+    {
+        "id": 3,
+        "metadata": {"channel": "test", "tags": ["a", "b"], "empty_list": [], "empty_dict": {}},
+        "reactions": [{"emoji": "👍", "count": 5}, {"emoji": "🔥", "count": 2}],
+    },
+    {"id": 4, "text": 'кавычки " и скобки ] [ в тексте', "nested": [[1, [2, {"k": "v"}]]]},
+]
+
+
+def _dumps(data: list) -> bytes:
+    """Эталонное форматирование, с которым должен совпадать файл"""
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+@pytest.mark.parametrize("items", [POSTS, NESTED_POSTS], ids=["flat", "nested"])
+def test_missing_file(tmp_path, items):
+    filepath = tmp_path / "messages.json"
+
+    append_to_json_array(filepath, items)
+
+    assert filepath.read_bytes() == _dumps(items)
+
+
+@pytest.mark.parametrize("items", [POSTS, NESTED_POSTS], ids=["flat", "nested"])
+def test_empty_file(tmp_path, items):
+    filepath = tmp_path / "messages.json"
+    filepath.write_bytes(b"")
+
+    append_to_json_array(filepath, items)
+
+    assert filepath.read_bytes() == _dumps(items)
+
+
+@pytest.mark.parametrize("content", [b"  ", b"\n\t\n"], ids=["spaces", "newlines"])
+def test_whitespace_only_file(tmp_path, content):
+    filepath = tmp_path / "messages.json"
+    filepath.write_bytes(content)
+
+    append_to_json_array(filepath, POSTS)
+
+    assert filepath.read_bytes() == _dumps(POSTS)
+
+
+@pytest.mark.parametrize("content", [b"[]", b"[\n]", b"[]\n"], ids=["compact", "multiline", "trailing-newline"])
+def test_empty_array(tmp_path, content):
+    filepath = tmp_path / "messages.json"
+    filepath.write_bytes(content)
+
+    append_to_json_array(filepath, POSTS)
+
+    assert filepath.read_bytes() == _dumps(POSTS)
+
+
+@pytest.mark.parametrize(
+    "existing, items",
+    [(POSTS, NESTED_POSTS), (NESTED_POSTS, POSTS), (NESTED_POSTS, NESTED_POSTS)],
+    ids=["flat+nested", "nested+flat", "nested+nested"],
+)
+def test_populated_array(tmp_path, existing, items):
+    filepath = tmp_path / "messages.json"
+    filepath.write_bytes(_dumps(existing))
+
+    append_to_json_array(filepath, items)
+
+    assert filepath.read_bytes() == _dumps(existing + items)
+    assert json.loads(filepath.read_bytes()) == existing + items
+
+
+def test_repeated_appends(tmp_path):
+    filepath = tmp_path / "messages.json"
+    expected = []
+
+    for item in POSTS + NESTED_POSTS:
+        append_to_json_array(filepath, [item])
+        expected.append(item)
+        assert filepath.read_bytes() == _dumps(expected)
+
+
+def test_item_larger_than_tail_window(tmp_path):
+    filepath = tmp_path / "messages.json"
+    existing = [{"id": 1, "text": "x" * 10_000}]
+    filepath.write_bytes(_dumps(existing))
+
+    append_to_json_array(filepath, POSTS)
+
+    assert filepath.read_bytes() == _dumps(existing + POSTS)
+
+
+def test_no_items_leaves_file_untouched(tmp_path):
+    filepath = tmp_path / "messages.json"
+    filepath.write_bytes(_dumps(POSTS))
+
+    append_to_json_array(filepath, [])
+
+    assert filepath.read_bytes() == _dumps(POSTS)
+
+
+def test_not_an_array(tmp_path):
+    filepath = tmp_path / "messages.json"
+    filepath.write_bytes(b'{"id": 1}\n{"id": 2}\n')
+
+    with pytest.raises(ValueError):
+        append_to_json_array(filepath, POSTS)
+
+    assert filepath.read_bytes() == b'{"id": 1}\n{"id": 2}\n'
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        _dumps(POSTS)[:-1],
+        _dumps(NESTED_POSTS)[: _dumps(NESTED_POSTS).index(b"] [") + 4],
+        _dumps(POSTS) + b"\n  {",
+    ],
+    ids=["missing-bracket", "bracket-inside-string", "item-after-bracket"],
+)
+def test_truncated_element(tmp_path, content):
+    filepath = tmp_path / "messages.json"
+    filepath.write_bytes(content)
+
+    with pytest.raises(ValueError):
+        append_to_json_array(filepath, POSTS)
+
+    assert filepath.read_bytes() == content
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from tplexity.tg_parse import telegram_downloader
+from tplexity.tg_parse.telegram_downloader import iter_json_array
+
+POSTS = [
+    {"id": 1, "text": "Первый пост", "views": 10},
+    {"id": 2, "text": "Второй\nпост со строками", "media_type": None},
+]
+
+NESTED_POSTS = [
+    {
+        "id": 3,
+        "metadata": {"channel": "test", "tags": ["a", "b"], "empty_list": [], "empty_dict": {}},
+        "reactions": [{"emoji": "👍", "count": 5}, {"emoji": "🔥", "count": 2}],
+    },
+    {"id": 4, "text": 'кавычки " и скобки ] [ в тексте', "nested": [[1, [2, {"k": "v"}]]]},
+]
+
+# Значения, которые легко разрезать границей блока: числа с экспонентой, литералы, escape-последовательности
+SCALARS = [12345, -1.5e-10, 1.25e300, 0, 10**20, True, False, None, 'éé\n"q"', "строка ] [ ,", "\\u0041"]
+
+CHUNK_SIZES = [1, 2, 3, 5, 7, 64, 1 << 20]
+
+
+@pytest.fixture(params=CHUNK_SIZES, ids=lambda size: f"chunk{size}")
+def chunk_size(request, monkeypatch):
+    monkeypatch.setattr(telegram_downloader, "_JSON_CHUNK_SIZE", request.param)
+    return request.param
+
+
+@pytest.mark.parametrize(
+    "data", [POSTS, NESTED_POSTS, SCALARS, [POSTS, SCALARS]], ids=["flat", "nested", "scalars", "mixed"]
+)
+@pytest.mark.parametrize("indent", [None, 2], ids=["compact", "indented"])
+@pytest.mark.parametrize("ensure_ascii", [False, True], ids=["utf8", "ascii"])
+def test_round_trip(tmp_path, chunk_size, data, indent, ensure_ascii):
+    filepath = tmp_path / "messages.json"
+    filepath.write_text(json.dumps(data, ensure_ascii=ensure_ascii, indent=indent), encoding="utf-8")
+
+    assert list(iter_json_array(filepath)) == data
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [("[12345, 678]", [12345, 678]), ("[-1.5e-10,true]", [-1.5e-10, True]), ('["\\u00e9", null]', ["é", None])],
+    ids=["integers", "exponent-and-literal", "escape-and-null"],
+)
+def test_values_split_across_blocks(tmp_path, monkeypatch, content, expected):
+    filepath = tmp_path / "messages.json"
+    filepath.write_text(content, encoding="utf-8")
+
+    # Границы блоков приходятся на середину каждого значения
+    for size in (2, 3, 4):
+        monkeypatch.setattr(telegram_downloader, "_JSON_CHUNK_SIZE", size)
+        assert list(iter_json_array(filepath)) == expected
+
+
+@pytest.mark.parametrize("content", ["", "  \n\t", "[]", "  [ ]  ", "[\n]\n"])
+def test_empty(tmp_path, chunk_size, content):
+    filepath = tmp_path / "messages.json"
+    filepath.write_text(content, encoding="utf-8")
+
+    assert list(iter_json_array(filepath)) == []
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        '{"id": 1}',
+        '{"id": 1}\n{"id": 2}\n',
+        '[{"id": 1},',
+        "[1, 2",
+        '[{"id": 1}, {"id": tru}, {"id": 3}]',
+        '[{"id": 1}, {"id": 2}',
+    ],
+    ids=["object", "jsonl", "unterminated", "unterminated-scalar", "malformed-item", "missing-bracket"],
+)
+def test_invalid(tmp_path, chunk_size, content):
+    filepath = tmp_path / "messages.json"
+    filepath.write_text(content, encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        list(iter_json_array(filepath))
+
+
+def test_malformed_item_fails_without_reading_rest_of_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(telegram_downloader, "_JSON_CHUNK_SIZE", 64)
+    filepath = tmp_path / "messages.json"
+    # Байты после битого элемента - невалидный UTF-8: дочитав до них, парсер упал бы с UnicodeDecodeError
+    filepath.write_bytes(b'[{"id": 1}, {"id": nope}, ' + b'{"id": 2}, ' * 1000 + b"\xff\xfe]")
+
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(filepath))